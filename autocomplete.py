@@ -0,0 +1,117 @@
+import difflib
+import itertools
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+MAX_RESULTS = 200
+DEBOUNCE_MS = 150
+
+# Keys around the query's sorted position that fuzzy matching compares against, so a
+# typo costs the same on any catalog size (typos in the first characters aren't found)
+FUZZY_WINDOW = 1000
+
+# Separates keys in the joined text substring search scans; it can't occur in a key
+KEY_SEPARATOR = "\n"
+
+# Sorts after any real character, so key + PREFIX_END bounds every string starting with key
+PREFIX_END = "\U0010ffff"
+
+
+class PrefixIndex:
+    """Case-folded sorted array of combobox values searched with bisect."""
+
+    def __init__(self, items):
+        pairs = sorted(((str(item).casefold(), item) for item in items), key=lambda pair: pair[0])
+        self.keys = [key for key, _ in pairs]
+        self.values = [value for _, value in pairs]
+        self.index_text()  # Rebuilt on the next substring search after add() or remove()
+
+    def __len__(self):
+        return len(self.values)
+
+    def add(self, item):
+        """Insert a value, keeping the arrays sorted (values differing only in case sort by value)."""
+        key = str(item).casefold()
+        position = bisect_left(self.keys, key)
+        while position < len(self.keys) and self.keys[position] == key and str(self.values[position]) < str(item):
+            position += 1
+        self.keys.insert(position, key)
+        self.values.insert(position, item)
+        self.joined = None
+
+    def remove(self, item):
+        """Remove one occurrence of a value, if present."""
+        key = str(item).casefold()
+        position = bisect_left(self.keys, key)
+        while position < len(self.keys) and self.keys[position] == key:
+            if self.values[position] == item:
+                del self.keys[position]
+                del self.values[position]
+                self.joined = None
+                return
+            position += 1
+
+    def prefix(self, text, limit=MAX_RESULTS):
+        """Values starting with text, in time proportional to the number returned."""
+        key = text.casefold()
+        start = bisect_left(self.keys, key)
+        end = bisect_left(self.keys, key + PREFIX_END, lo=start)
+        return self.values[start:min(end, start + limit)]
+
+    def index_text(self):
+        """Join the keys for substring search and record where each one starts."""
+        step = len(KEY_SEPARATOR)
+        # Packed 64-bit offsets: a list of ints costs 4-5x as much on big catalogs
+        self.starts = array("q", itertools.accumulate((len(key) + step for key in self.keys[:-1]), initial=0))
+        self.joined = KEY_SEPARATOR.join(self.keys)
+
+    def substring(self, text, limit=MAX_RESULTS):
+        """Values containing text anywhere, found with str.find over all keys joined into one string."""
+        key = text.casefold().replace(KEY_SEPARATOR, " ")
+        if not key or not self.keys:
+            return self.values[:limit]
+        if self.joined is None:
+            self.index_text()
+        matches = []
+        position = self.joined.find(key)
+        while position != -1 and len(matches) < limit:
+            i = bisect_right(self.starts, position) - 1
+            if position + len(key) <= self.starts[i] + len(self.keys[i]):  # Not across a separator
+                matches.append(self.values[i])
+                position = self.starts[i] + len(self.keys[i])  # One match per key
+            position = self.joined.find(key, position + 1)
+        return matches
+
+    def fuzzy(self, text, limit=10, cutoff=0.75):
+        """Closest values to text among the FUZZY_WINDOW keys that sort around it, for typos."""
+        key = text.casefold()
+        start = max(0, bisect_left(self.keys, key) - FUZZY_WINDOW // 2)
+        candidates = self.keys[start:start + FUZZY_WINDOW]
+        close = difflib.get_close_matches(key, candidates, n=limit, cutoff=cutoff)
+        return [self.values[bisect_left(self.keys, match)] for match in close]
+
+    def search(self, text, limit=MAX_RESULTS, fallback=True):
+        """Prefix matches, falling back to substring and then fuzzy matches when there are none."""
+        if not text:
+            return self.values[:limit]
+        matches = self.prefix(text, limit)
+        if matches or not fallback:
+            return matches
+        return self.substring(text, limit) or self.fuzzy(text)
+
+
+def debounce(widget, callback, delay_ms=DEBOUNCE_MS):
+    """Wrap a Tk event handler so it runs once, delay_ms after the last event."""
+    pending = {"after_id": None}
+
+    def run(event):
+        pending["after_id"] = None
+        callback(event)
+
+    def handler(event):
+        if pending["after_id"] is not None:
+            widget.after_cancel(pending["after_id"])
+        pending["after_id"] = widget.after(delay_ms, run, event)
+
+    return handler
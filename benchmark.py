@@ -0,0 +1,390 @@
+"""Benchmark label rendering, ZPL conversion, catalog loading and print submission.
+
+Results are written as JSON so runs can be compared across commits. Printing is
+measured against a stand-in CUPS (fake lpstat/lpr) and a local raw TCP 9100
+listener, so no printer is needed.
+
+Examples:
+    python benchmark.py --output bench.json
+    python benchmark.py --rows 10000,100000 --repeat 50 --skip send
+"""
+import argparse
+import ast
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from PIL import Image
+import label_generator
+import printer_manager
+import zpl_cache
+from catalog import load_catalog
+from label_generator import (
+    create_1x2_product_label, create_1x3_product_label, create_2x4_shelf_label, generate_codes,
+)
+from print_jobs import build_batch, render_label_zpl
+from zpl import GRAPHIC_ENCODINGS, image_to_zpl
+
+
+DEFAULT_ROWS = "10000,100000,1000000"
+DEFAULT_REPEAT = 30
+
+# Import time allowed for everything the GUI imports before its window appears
+IMPORT_BUDGET_MS = 250
+GUI_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "printer.py")
+DATA_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data.csv")
+
+# One representative label per type, taken from the first row of data.csv
+SAMPLE_FIELDS = {
+    "1x2": {
+        "qr_data": "BCM9465", "barcode_data": "2257898", "description": "RED BARRICADE TAG",
+        "bin_location": "BCM9465", "product_code": "2257898", "title": "BIG CITY MANUFACTURING",
+    },
+    "1x3": {
+        "qr_data": "BCM9465", "barcode_data": "2257898", "description": "RED BARRICADE TAG",
+        "bin_location": "BCM9465", "product_code": "2257898", "title": "BIG CITY MANUFACTURING",
+    },
+    "2x4": {"bin_location": "CE20*CE10", "title": "EquipmentShare"},
+}
+
+CREATE_FUNCTIONS = {
+    "1x2": create_1x2_product_label,
+    "1x3": create_1x3_product_label,
+    "2x4": create_2x4_shelf_label,
+}
+
+
+def summarize(samples):
+    """Millisecond summary of a list of durations in seconds."""
+    ms = sorted(sample * 1000 for sample in samples)
+    return {
+        "runs": len(ms),
+        "min_ms": round(ms[0], 4),
+        "median_ms": round(statistics.median(ms), 4),
+        "mean_ms": round(statistics.fmean(ms), 4),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 4),
+    }
+
+
+def measure(fn, repeat):
+    """Call fn(i) repeat times and summarize the durations."""
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def unique_fields(label_type, i):
+    """Sample fields made unique per run so symbol and ZPL caches miss."""
+    fields = dict(SAMPLE_FIELDS[label_type])
+    if label_type == "2x4":
+        fields["bin_location"] = f"{fields['bin_location']}{i}"
+    else:
+        fields["qr_data"] = fields["bin_location"] = f"{fields['qr_data']}-{i}"
+        fields["barcode_data"] = fields["product_code"] = f"{fields['barcode_data']}{i}"
+    return fields
+
+
+def remove_files(*paths):
+    """Delete temporary PNGs left by the file-based API."""
+    for path in paths:
+        if path:
+            os.remove(path)
+
+
+def bench_codes(repeat):
+    """Time generate_codes (QR and Code128 written to temporary PNGs)."""
+    def run(i):
+        remove_files(*generate_codes(f"BCM9465-{i}", f"2257898{i}"))
+    return {"generate_codes": measure(run, repeat)}
+
+
+def bench_labels(repeat):
+    """Time each create_* function, convert_to_zpl and the cached render path, and record ZPL sizes."""
+    results = {}
+    for label_type, create in CREATE_FUNCTIONS.items():
+        label_generator.clear_symbol_cache()
+        create(**SAMPLE_FIELDS[label_type])  # Build the layout template outside the timings
+
+        def run_create(i, label_type=label_type, create=create):
+            remove_files(create(**unique_fields(label_type, i)))
+
+        png_file = create(**SAMPLE_FIELDS[label_type])
+
+        def run_convert(i, png_file=png_file):
+            # A saved PNG to raster ZPL, as the GUI did before labels rendered straight to ZPL
+            with Image.open(png_file) as image:
+                image_to_zpl(image)
+
+        def run_cached(i, label_type=label_type):
+            render_label_zpl(label_type, SAMPLE_FIELDS[label_type])
+
+        with Image.open(png_file) as image:
+            sizes = {
+                "raster_compressed": len(image_to_zpl(image)),
+                "raster_uncompressed": len(image_to_zpl(image, compress=False)),
+                "raster_binary": len(image_to_zpl(image, binary=True)),
+            }
+            for encoding in GRAPHIC_ENCODINGS:
+                sizes[f"raster_{encoding}"] = len(image_to_zpl(image, encoding=encoding))
+            parity = zebrafy_parity(image)
+        sizes["native"] = len(render_label_zpl(label_type, SAMPLE_FIELDS[label_type], backend="native").encode("utf-8"))
+        # A 20-label job with one title: the title graphic is downloaded once and recalled
+        batch = [(label_type, unique_fields(label_type, i), 1) for i in range(20)]
+        sizes["raster_batch_20"] = len(build_batch(batch))
+
+        zpl_cache.clear_zpl_cache()
+        results[label_type] = {
+            "create": measure(run_create, repeat),
+            "convert_to_zpl": measure(run_convert, repeat),
+            "render_zpl_cached": measure(run_cached, repeat),
+            "zpl_bytes": sizes,
+            "zebrafy_parity": parity,
+        }
+        remove_files(png_file)
+    return results
+
+
+def zebrafy_parity(image):
+    """Whether uncompressed output still matches Zebrafy byte for byte (None without Zebrafy)."""
+    try:
+        from zebrafy import ZebrafyImage
+    except ImportError:
+        return None
+    return image_to_zpl(image, compress=False) == ZebrafyImage(image, invert=True).to_zpl()
+
+
+def synthetic_catalog(source_csv, rows, path):
+    """Write a catalog of the given size by repeating the source export with unique part keys."""
+    source = pd.read_csv(source_csv)
+    positions = np.arange(rows) % len(source)
+    copy = np.arange(rows) // len(source)
+    df = source.iloc[positions].reset_index(drop=True)
+    suffix = np.where(copy > 0, "-" + copy.astype(str), "")
+    df["Part Number"] = df["Part Number"].astype(str) + suffix
+    for column in ("Part ID", "Store Part ID"):
+        df[column] = df[column] + copy * 10_000_000
+    df.to_csv(path, index=False)
+    return df["Part Number"].sample(min(rows, 1000), random_state=0).tolist()
+
+
+def bench_catalog(source_csv, row_counts, repeat):
+    """Time cold and cached catalog loads and indexed lookups on synthetic catalogs."""
+    results = {}
+    for rows in row_counts:
+        work_dir = tempfile.mkdtemp(prefix="label-bench-")
+        try:
+            csv_path = os.path.join(work_dir, "catalog.csv")
+            keys = synthetic_catalog(source_csv, rows, csv_path)
+            cache_dir = os.path.join(work_dir, "cache")
+
+            start = time.perf_counter()
+            catalog = load_catalog(csv_path, cache_dir)
+            cold = time.perf_counter() - start
+
+            start = time.perf_counter()
+            catalog = load_catalog(csv_path, cache_dir)
+            cached = time.perf_counter() - start
+
+            results[str(rows)] = {
+                "csv_bytes": os.path.getsize(csv_path),
+                "load_cold_ms": round(cold * 1000, 2),
+                "load_cached_ms": round(cached * 1000, 2),
+                "lookup": measure(lambda i: catalog.parts_for_number(keys[i % len(keys)]), repeat * 10),
+                "prefix_search": measure(lambda i: catalog.manufacturer_index.search(keys[i % len(keys)][:3]), repeat * 10),
+            }
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+@contextmanager
+def fake_cups(queue_name):
+    """Put stand-in lpstat/lpr executables on PATH that list one queue and discard jobs."""
+    bin_dir = tempfile.mkdtemp(prefix="fake-cups-")
+    scripts = {
+        "lpstat": f"#!/bin/sh\necho 'printer {queue_name} is idle.  enabled since Mon 01 Jan 2024'\n",
+        "lpr": "#!/bin/sh\ncat > /dev/null\n",
+    }
+    for name, body in scripts.items():
+        path = os.path.join(bin_dir, name)
+        with open(path, "w") as f:
+            f.write(body)
+        os.chmod(path, 0o755)
+
+    old_path = os.environ.get("PATH", "")
+    os.environ["PATH"] = bin_dir + os.pathsep + old_path
+    # zebra runs lpstat with a bare environment (no PATH), so point discovery at the stand-in
+    zebra_class = printer_manager.zebra.Zebra
+    original_getqueues = zebra_class._getqueues_unix
+
+    def getqueues(self):
+        output = subprocess.check_output([os.path.join(bin_dir, "lpstat"), "-p"], universal_newlines=True)
+        return [line.split(" ")[1] for line in output.split("\n") if line.startswith("printer")]
+
+    zebra_class._getqueues_unix = getqueues
+    try:
+        yield
+    finally:
+        zebra_class._getqueues_unix = original_getqueues
+        os.environ["PATH"] = old_path
+        shutil.rmtree(bin_dir, ignore_errors=True)
+
+
+@contextmanager
+def fake_network_printer():
+    """Listen on a local port like a Zebra's raw TCP 9100 and discard whatever arrives."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    received = {"bytes": 0}
+
+    def drain(conn):
+        with conn:
+            while True:
+                data = conn.recv(1 << 16)
+                if not data:
+                    return
+                received["bytes"] += len(data)
+
+    def accept_loop():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            threading.Thread(target=drain, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=accept_loop, daemon=True).start()
+    try:
+        yield server.getsockname(), received
+    finally:
+        server.close()
+
+
+def bench_send(repeat):
+    """Time queue discovery and ZPL submission through CUPS and raw TCP stand-ins."""
+    zpl_content = render_label_zpl("1x2", SAMPLE_FIELDS["1x2"])
+    results = {}
+
+    if os.name != "nt":
+        with fake_cups("Bench_Zebra"):
+            results["cups_discovery"] = measure(lambda i: printer_manager.get_queues(max_age=0), repeat)
+            results["cups_send"] = measure(lambda i: printer_manager.send_zpl(zpl_content, "Bench_Zebra"), repeat)
+
+    with fake_network_printer() as ((host, port), received):
+        printer_manager.add_network_printer("bench-tcp", host, port)
+        try:
+            results["tcp_send"] = measure(lambda i: printer_manager.send_zpl(zpl_content, "bench-tcp"), repeat * 10)
+        finally:
+            printer_manager.network_printers.pop("bench-tcp").close()
+    results["zpl_bytes"] = len(zpl_content)
+    return results
+
+
+def startup_imports(script=GUI_SCRIPT):
+    """Import statements a script runs at module level, i.e. before its window can appear."""
+    with open(script, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def bench_startup(repeat, budget_ms=IMPORT_BUDGET_MS, script=GUI_SCRIPT):
+    """Time the GUI's module-level imports in fresh interpreters and compare them with the budget."""
+    imports = startup_imports(script)
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        + "".join(statement + "\n" for statement in imports)
+        + "print(time.perf_counter() - start)\n"
+    )
+    samples = []
+    for _ in range(max(3, repeat // 5)):
+        # Run next to the script so its sibling modules import from any working directory
+        output = subprocess.check_output([sys.executable, "-c", code], text=True, cwd=os.path.dirname(os.path.abspath(script)))
+        samples.append(float(output.strip().splitlines()[-1]))
+    result = summarize(samples)
+    result.update(imports=imports, budget_ms=budget_ms, within_budget=result["median_ms"] <= budget_ms)
+    return result
+
+
+def git_commit():
+    """Current commit of the working tree, if it's a git checkout."""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark label rendering, ZPL conversion and printing.")
+    parser.add_argument("--csv", default=DATA_CSV, help="export the synthetic catalogs are scaled from")
+    parser.add_argument("--rows", default=DEFAULT_ROWS, help="comma-separated synthetic catalog sizes")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="runs per timing")
+    parser.add_argument("--skip", default="", help="comma-separated sections to skip: startup,codes,labels,catalog,send")
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS,
+                        help="fail (exit 1) if the GUI's startup imports take longer than this")
+    parser.add_argument("--output", default="bench_output.json", help="where to write the JSON results")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    skip = {section.strip() for section in args.skip.split(",") if section.strip()}
+
+    # Keep the benchmark's ZPL entries out of the real cache
+    cache_dir = tempfile.mkdtemp(prefix="label-bench-cache-")
+    zpl_cache.ZPL_CACHE_DIR = cache_dir
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeat": args.repeat,
+    }
+    try:
+        sections = [
+            ("startup", lambda: bench_startup(args.repeat, args.import_budget_ms)),
+            ("codes", lambda: bench_codes(args.repeat)),
+            ("labels", lambda: bench_labels(args.repeat)),
+            ("catalog", lambda: bench_catalog(args.csv, [int(n) for n in args.rows.split(",") if n], args.repeat)),
+            ("send", lambda: bench_send(args.repeat)),
+        ]
+        for name, run in sections:
+            if name in skip:
+                continue
+            print(f"Benchmarking {name}...", file=sys.stderr)
+            results[name] = run()
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}", file=sys.stderr)
+
+    startup = results.get("startup")
+    if startup and not startup["within_budget"]:
+        print(f"GUI startup imports took {startup['median_ms']:.0f} ms, over the "
+              f"{startup['budget_ms']:.0f} ms budget.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""Print labels in bulk from an inventory export without the GUI.
+
+Examples:
+    python bulk_print.py --store "Mobile Tool Trailer Warehouse" --label 2x4 --printer Zebra_ZD421
+    python bulk_print.py data.csv --bin-prefix CE --label 1x3 --output labels.zpl
+    python bulk_print.py --store "Mobile Tool Trailer Warehouse" --printers dock1,dock2,dock3
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import pandas as pd
+from print_jobs import render_label_zpl, send_batch, with_copies
+from print_scheduler import GROUP_PREFIX, PrintScheduler, printer_groups
+from zpl import share_graphics
+
+
+LABEL_COLUMNS = ["Store Name", "Bin Location", "Part Number", "Part ID", "Description", "Provider"]
+SHELF_TITLE = "EquipmentShare"
+
+
+def load_rows(csv_path, store=None, bin_prefix=None, parts=None):
+    """Read the label columns of an export and apply the store/bin/part filters."""
+    df = pd.read_csv(csv_path, usecols=LABEL_COLUMNS, dtype=str, keep_default_na=False)
+    if store:
+        df = df[df["Store Name"] == store]
+    if bin_prefix:
+        df = df[df["Bin Location"].str.upper().str.startswith(bin_prefix.upper())]
+    if parts:
+        df = df[df["Part Number"].isin(parts) | df["Part ID"].isin(parts)]
+    return df.to_dict("records")
+
+
+def label_items(rows, label_type, copies=1):
+    """Turn export rows into (label type, fields, copies) items, one shelf label per bin."""
+    items = []
+    if label_type == "2x4":
+        seen = set()
+        for row in rows:
+            bin_location = row["Bin Location"]
+            if bin_location and bin_location not in seen:
+                seen.add(bin_location)
+                items.append((label_type, {"bin_location": bin_location, "title": SHELF_TITLE}, copies))
+        return items
+
+    # Same field mapping as the GUI's product labels
+    for row in rows:
+        items.append((label_type, {
+            "qr_data": row["Part Number"],
+            "barcode_data": row["Part ID"],
+            "description": row["Description"],
+            "bin_location": row["Part Number"],
+            "product_code": row["Part ID"],
+            "title": row["Provider"],
+        }, copies))
+    return items
+
+
+def render_item(item, backend="raster", printer_name=None, threshold=None):
+    """Render one (label type, fields, copies) item to ZPL."""
+    label_type, fields, copies = item
+    return with_copies(render_label_zpl(label_type, fields, backend, printer_name, threshold), copies)
+
+
+def render_raster_item(item, threshold=None):
+    """Process pool entry point for raster rendering."""
+    return render_item(item, threshold=threshold)
+
+
+def render_items(items, backend="raster", printer_name=None, workers=None, chunk_size=16, threshold=None):
+    """Yield rendered labels in input order, rasterizing across a process pool."""
+    if backend != "raster" or workers == 1:
+        # Native and stored ZPL are cheap string building, and stored formats track
+        # per-printer state that has to stay in this process
+        for item in items:
+            yield render_item(item, backend, printer_name, threshold)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(partial(render_raster_item, threshold=threshold), items, chunksize=chunk_size)
+
+
+def write_labels(labels, printer_name=None, output=None, batch_size=50, backend="raster"):
+    """Stream rendered labels to a printer in batches, to a file, or to stdout.
+
+    Returns (labels written, batches the printer didn't accept).
+    """
+    count = failed = 0
+    if printer_name:
+        batch = []
+        for zpl_content in labels:
+            batch.append(zpl_content)
+            count += 1
+            if len(batch) >= batch_size:
+                # send_batch also forgets the printer's stored formats when a send fails
+                failed += not send_batch(share_graphics(batch), printer_name, backend)
+                batch = []
+        if batch:
+            failed += not send_batch(share_graphics(batch), printer_name, backend)
+        return count, failed
+
+    stream = open(output, "w", encoding="utf-8") if output else sys.stdout
+    try:
+        for zpl_content in labels:
+            stream.write(zpl_content)
+            count += 1
+    finally:
+        if output:
+            stream.close()
+    return count, 0
+
+
+def schedule_labels(rows, label_type, printers, backend="raster", copies=1, batch_size=50, threshold=None):
+    """Spread labels over a printer group, keeping each bin's labels in order on one printer.
+
+    Returns (labels queued, jobs that failed or were never queued).
+    """
+    bins = {}
+    for row in rows:
+        bins.setdefault(row["Bin Location"], []).append(row)
+
+    scheduler = PrintScheduler(printers, backend, threshold=threshold)
+    jobs = []
+    for bin_location, bin_rows in bins.items():
+        items = label_items(bin_rows, label_type, copies)
+        jobs += [(bin_location, items[start:start + batch_size]) for start in range(0, len(items), batch_size)]
+    count = skipped = 0
+    for position, (bin_location, items) in enumerate(jobs):
+        try:
+            scheduler.submit(items, key=bin_location)
+        except RuntimeError as e:  # Every printer in the group is down
+            skipped = len(jobs) - position
+            print(f"{e} {skipped} job(s) not queued.", file=sys.stderr)
+            break
+        count += len(items)
+    scheduler.join()
+    scheduler.shutdown()
+
+    for printer, counts in scheduler.stats().items():
+        print(f"{printer}: {counts['sent']} jobs sent, {counts['failed']} failed sends", file=sys.stderr)
+    return count, scheduler.failed_jobs + skipped
+
+
+def group_members(args):
+    """Printers to spread over from --printers or --printer group:NAME, or None for a single printer."""
+    if args.printers:
+        return [printer.strip() for printer in args.printers.split(",") if printer.strip()]
+    if args.printer and args.printer.startswith(GROUP_PREFIX):
+        name = args.printer[len(GROUP_PREFIX):]
+        if name not in printer_groups:
+            raise SystemExit(f"Unknown printer group {name}; define it in ZEBRA_PRINTER_GROUPS.")
+        return printer_groups[name]
+    return None
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Render and print labels in bulk from an inventory export.")
+    parser.add_argument("csv", nargs="?", default="data.csv", help="inventory export (default: data.csv)")
+    parser.add_argument("--label", choices=["1x2", "1x3", "2x4"], default="1x2", help="label type")
+    parser.add_argument("--backend", choices=["raster", "native", "stored"], default="raster",
+                        help="render with PIL, as native ZPL fields, or as stored-format recalls")
+    parser.add_argument("--store", help="only rows for this Store Name")
+    parser.add_argument("--bin-prefix", help="only bins starting with this prefix")
+    parser.add_argument("--parts", help="comma-separated Part Numbers/Part IDs, or @file with one per line")
+    parser.add_argument("--threshold", type=int, default=None,
+                        help="binarize raster labels at this gray level (0-255) instead of dithering")
+    parser.add_argument("--copies", type=int, default=1, help="copies of each label")
+    parser.add_argument("--printer", help="send to this printer (or group:NAME) instead of writing ZPL")
+    parser.add_argument("--printers", help="comma-separated printers to spread the labels over")
+    parser.add_argument("--output", help="write ZPL to this file instead of stdout")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=50, help="labels per print job")
+    return parser.parse_args(argv)
+
+
+def parse_parts(spec):
+    """Read a part list from "a,b,c" or "@file"."""
+    if not spec:
+        return None
+    if spec.startswith("@"):
+        with open(spec[1:], encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    return [part.strip() for part in spec.split(",") if part.strip()]
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.backend == "stored" and not (args.printer or args.printers):
+        print("--backend stored needs --printer, since formats are tracked per printer.", file=sys.stderr)
+        return 2
+
+    rows = load_rows(args.csv, args.store, args.bin_prefix, parse_parts(args.parts))
+    printers = group_members(args)
+    if printers:
+        count, failed = schedule_labels(rows, args.label, printers, args.backend, args.copies, args.batch_size,
+                                        args.threshold)
+        print(f"Queued {count} labels from {os.path.basename(args.csv)}, {failed} job(s) failed.", file=sys.stderr)
+        return 1 if failed else 0
+
+    items = label_items(rows, args.label, args.copies)
+    labels = render_items(items, args.backend, args.printer, args.workers, threshold=args.threshold)
+    count, failed = write_labels(labels, args.printer, args.output, args.batch_size, args.backend)
+    if failed:
+        print(f"Rendered {count} labels from {os.path.basename(args.csv)}, {failed} batch(es) failed to send.",
+              file=sys.stderr)
+        return 1
+    print(f"Rendered {count} labels from {os.path.basename(args.csv)}.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""Alignment patterns and media calibration built from native ZPL primitives.
+
+Examples:
+    python calibration.py 1x3 --printer Zebra_ZD421
+    python calibration.py 2.25x1.25 --dpi 300 --media mark --output align.zpl
+"""
+import argparse
+import sys
+from label_generator import DPI
+
+
+# Label stocks in inches (width, height) by label type
+LABEL_SIZES = {
+    "1x2": (2, 1),
+    "1x3": (3, 1),
+    "2x4": (4, 2),
+}
+
+# ^MN media tracking per stock: gap/notch (web) sensing, black mark sensing or continuous
+MEDIA_TRACKING = {
+    "gap": "Y",
+    "mark": "M",
+    "continuous": "N",
+}
+
+# Dot ruler along the top and left edges: a tick every RULER_MINOR dots, longer
+# numbered ticks every RULER_MAJOR dots
+RULER_MINOR = 20
+RULER_MAJOR = 100
+
+
+def label_dots(width_in, height_in, dpi=DPI):
+    """Label size in printer dots, rounded down like the rasterized layouts."""
+    return int(width_in * dpi), int(height_in * dpi)
+
+
+def parse_size(size):
+    """Label dimensions in inches from a label type ("1x3") or a "WIDTHxHEIGHT" size ("2.25x1.25")."""
+    if size in LABEL_SIZES:
+        return LABEL_SIZES[size]
+    try:
+        width_in, height_in = (float(part) for part in size.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Unknown label size: {size}") from None
+    if width_in <= 0 or height_in <= 0:
+        raise ValueError(f"Unknown label size: {size}")
+    return width_in, height_in
+
+
+def box(x, y, width, height, thickness=1):
+    """A ^GB box; a box as thin as its line thickness draws a line."""
+    return f"^FO{x},{y}^GB{width},{height},{thickness}^FS"
+
+
+def ruler_fields(width, height, dpi=DPI):
+    """Tick marks every RULER_MINOR dots along the top and left edges, numbered every RULER_MAJOR."""
+    minor = max(4, dpi // 25)
+    major = minor * 2
+    font_size = max(12, dpi // 12)
+    fields = []
+    for x in range(RULER_MINOR, width, RULER_MINOR):
+        fields.append(box(x, 0, 1, major if x % RULER_MAJOR == 0 else minor))
+        if x % RULER_MAJOR == 0 and x + 2 * font_size < width:
+            fields.append(f"^FO{x + 3},{major}^A0N,{font_size},{font_size}^FD{x}^FS")
+    for y in range(RULER_MINOR, height, RULER_MINOR):
+        fields.append(box(0, y, major if y % RULER_MAJOR == 0 else minor, 1))
+        if y % RULER_MAJOR == 0 and y + font_size < height:
+            fields.append(f"^FO{major + 3},{y + 3}^A0N,{font_size},{font_size}^FD{y}^FS")
+    return fields
+
+
+def alignment_label(width, height, dpi=DPI):
+    """ZPL alignment pattern for a width x height dot label: border, center crosshairs and dot rulers.
+
+    A correctly aligned stock shows the whole border just inside the label edge
+    and the crosshairs on its center; the rulers read the offset in dots for ^LH/^LT.
+    """
+    thickness = max(2, dpi // 100)
+    center_x, center_y = width // 2, height // 2
+    arm = min(width, height) // 4
+    fields = [f"^XA^PW{width}^LL{height}^LH0,0"]
+    fields.append(box(0, 0, width, height, thickness))
+    fields.append(box(center_x - arm, center_y - thickness // 2, 2 * arm, thickness, thickness))
+    fields.append(box(center_x - thickness // 2, center_y - arm, thickness, 2 * arm, thickness))
+    fields.extend(ruler_fields(width, height, dpi))
+
+    # Size caption under the crosshairs
+    font_size = max(12, dpi // 12)
+    caption = f"{width / dpi:g} x {height / dpi:g} in, {width} x {height} dots, {dpi} dpi"
+    fields.append(f"^FO0,{center_y + arm + thickness}^A0N,{font_size},{font_size}^FB{width},1,0,C,0^FD{caption}^FS")
+    fields.append("^XZ")
+    return "".join(fields) + "\n"
+
+
+def media_setup(width, height, media="gap", calibrate=True, save=False):
+    """Set media tracking and label size, then have the printer measure the stock with ~JC.
+
+    With save the settings are written to the printer's configuration (^JUS) so
+    they survive a power cycle.
+    """
+    if media not in MEDIA_TRACKING:
+        raise ValueError(f"Unknown media type: {media}")
+    setup = f"^XA^MN{MEDIA_TRACKING[media]}^PW{width}^LL{height}{'^JUS' if save else ''}^XZ\n"
+    if calibrate:
+        setup += "~JC\n"
+    return setup
+
+
+def alignment_job(size, dpi=DPI, media="gap", calibrate=True, save=False):
+    """Media setup followed by the alignment pattern for a label type or "WIDTHxHEIGHT" size."""
+    width, height = label_dots(*parse_size(size), dpi)
+    return media_setup(width, height, media, calibrate, save) + alignment_label(width, height, dpi)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print an alignment pattern and calibrate the media.")
+    parser.add_argument("size", help=f"label type ({', '.join(LABEL_SIZES)}) or WIDTHxHEIGHT in inches")
+    parser.add_argument("--dpi", type=int, default=DPI, help="printer resolution")
+    parser.add_argument("--media", choices=list(MEDIA_TRACKING), default="gap", help="media tracking (^MN)")
+    parser.add_argument("--no-calibrate", action="store_true", help="skip the ~JC media calibration")
+    parser.add_argument("--save", action="store_true", help="save the media settings on the printer (^JUS)")
+    parser.add_argument("--printer", help="CUPS queue or network printer to send to")
+    parser.add_argument("--output", help="write the ZPL to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    try:
+        zpl_content = alignment_job(args.size, args.dpi, args.media, not args.no_calibrate, args.save)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.printer:
+        from print_jobs import send_batch
+        return 0 if send_batch(zpl_content, args.printer, "native") else 1
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(zpl_content)
+    else:
+        sys.stdout.write(zpl_content)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
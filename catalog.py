@@ -0,0 +1,640 @@
+import glob
+import hashlib
+import json
+import os
+from bisect import bisect_left, insort
+from collections.abc import Mapping
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_integer_dtype, is_string_dtype, union_categoricals
+from autocomplete import PrefixIndex
+from telemetry import timed
+
+
+# Only the columns the labels and lookups use; cost and date columns are dropped
+CATALOG_COLUMNS = [
+    "Store Name", "Bin Location", "Provider", "Description",
+    "Part Number", "Store Part ID", "Part ID", "UPC",
+]
+
+# Explicit dtypes so nothing is inferred per file: names repeated on many rows are
+# categoricals, IDs are nullable integers and codes stay strings (UPC leading zeros)
+CATALOG_DTYPES = {
+    "Store Name": "category",
+    "Bin Location": "category",
+    "Provider": "category",
+    "Description": "string",
+    "Part Number": "string",
+    "Store Part ID": "Int64",
+    "Part ID": "Int64",
+    "UPC": "string",
+}
+
+# Integer ID columns, parsed as text and converted per chunk: a malformed ID ("4028313A")
+# becomes missing instead of failing the whole export
+ID_COLUMNS = ("Store Part ID", "Part ID")
+
+# Rows parsed per chunk when streaming an export, bounding the parser's working memory
+CHUNK_ROWS = 100_000
+
+# Column that identifies a row across exports; row diffs are keyed on it
+ROW_KEY = "Store Part ID"
+
+# Combobox columns counted per value, so a value can be dropped when its last row goes away;
+# the Part ID and Part Number lists are read off their lookup indexes instead
+COUNTED_COLUMNS = ('Store Name',)
+
+CACHE_DIR = os.environ.get("LABEL_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "printer"))
+
+# Cached exports kept in CACHE_DIR; writing a new one deletes the least recently used beyond this
+CACHE_ENTRIES = 4
+
+
+def index_key(value):
+    """Normalize a cell to the string the GUI would type (655339000.0 -> "655339000")."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+class LabelIndex(Mapping):
+    """Row labels per normalized value of a column, kept as sorted arrays rather than a dict of lists.
+
+    The distinct values are sorted once and looked up by binary search; labels
+    added or removed later by apply_changes go into small overlays on top, so a
+    million-row export costs a few arrays instead of a Python list per value.
+    """
+
+    def __init__(self, keys=(), starts=(0,), labels=()):
+        # Sorted distinct values, integers for integer columns
+        self.distinct = np.asarray(keys) if len(keys) else np.empty(0, dtype=object)
+        self.starts = np.asarray(starts, dtype=np.int64)  # distinct[i]'s labels are labels[starts[i]:starts[i + 1]]
+        self.labels = np.asarray(labels)
+        self.added = {}
+        self.removed = set()
+
+    def base_labels(self, key):
+        """Labels the arrays hold for a normalized key."""
+        if self.distinct.dtype.kind == "i":
+            try:
+                value = int(key)
+            except ValueError:
+                return []
+            if str(value) != key:
+                return []  # Only the canonical spelling index_key() produces matches
+            key = value
+        position = int(np.searchsorted(self.distinct, key))
+        if position < len(self.distinct) and self.distinct[position] == key:
+            return self.labels[self.starts[position]:self.starts[position + 1]].tolist()
+        return []
+
+    def get(self, key, default=None):
+        labels = self.base_labels(key)
+        if self.removed:
+            labels = [label for label in labels if label not in self.removed]
+        labels += self.added.get(key, [])
+        return labels or default
+
+    def __getitem__(self, key):
+        labels = self.get(key)
+        if labels is None:
+            raise KeyError(key)
+        return labels
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __iter__(self):
+        base_keys = [str(key) for key in self.distinct.tolist()]
+        for key in base_keys:
+            if key in self:
+                yield key
+        base_keys = set(base_keys)
+        yield from (key for key in self.added if key not in base_keys)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def add(self, key, label):
+        """Index one more row under key."""
+        self.added.setdefault(key, []).append(label)
+
+    def remove(self, key, label):
+        """Drop a row from key; a label is indexed under one key, so the arrays' copy is masked by label."""
+        labels = self.added.get(key)
+        if labels and label in labels:
+            labels.remove(label)
+            if not labels:
+                del self.added[key]
+        else:
+            self.removed.add(label)
+
+
+def build_index(df, column, skip=()):
+    """Index each normalized value of a column to the row labels holding it."""
+    if column not in df:
+        return LabelIndex()
+    values = df[column]
+    if skip:
+        values = values.mask(values.isin(skip))
+    if not (is_integer_dtype(values) or is_string_dtype(values)):
+        # 12 and 12.0 normalize to the same key
+        values = values.map(index_key, na_action="ignore")
+
+    # Vectorized: sort the distinct values, then group the row labels by value
+    codes, keys = pd.factorize(values, sort=True)
+    present = codes >= 0
+    codes = codes[present]
+    labels = df.index.to_numpy()[present][np.argsort(codes, kind="stable")]
+    starts = np.zeros(len(keys) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=len(keys)), out=starts[1:])
+    keys = keys.to_numpy(dtype=np.int64 if is_integer_dtype(keys) else object)
+    return LabelIndex(keys, starts, labels)
+
+
+def merge_counts(counts, chunk_counts):
+    """Fold one chunk's value counts (a Series) into the running counts, ignoring unseen categories."""
+    for value, count in zip(chunk_counts.index.tolist(), chunk_counts.tolist()):
+        if count:
+            counts[value] = counts.get(value, 0) + count
+
+
+def parse_ids(values):
+    """Convert an ID column read as text to nullable integers; cells that aren't whole numbers become missing."""
+    numbers = pd.to_numeric(values, errors="coerce")
+    numbers = numbers.where((numbers % 1 == 0) & (numbers.abs() < 2 ** 63))
+    invalid = int(numbers.isna().sum() - values.isna().sum())
+    if invalid:
+        print(f"Ignoring {invalid} non-numeric {values.name} value(s)")
+    return numbers.astype("Int64")
+
+
+def read_catalog_chunks(csv_path, chunk_rows=CHUNK_ROWS):
+    """Stream the catalog columns of an export in chunks with the explicit schema."""
+    dtypes = {column: "string" if column in ID_COLUMNS else dtype for column, dtype in CATALOG_DTYPES.items()}
+    chunks = pd.read_csv(
+        csv_path,
+        usecols=lambda column: column in CATALOG_COLUMNS,
+        dtype=dtypes,
+        chunksize=chunk_rows,
+    )
+    for chunk in chunks:
+        for column in ID_COLUMNS:
+            if column in chunk:
+                chunk[column] = parse_ids(chunk[column])
+        yield chunk
+
+
+def combine_chunks(chunks):
+    """Concatenate chunks, merging each categorical column's categories instead of falling back to strings.
+
+    Consumes the chunks: each column is released from them as soon as it's combined,
+    so the export is never held twice over.
+    """
+    if not chunks:
+        return pd.DataFrame(columns=CATALOG_COLUMNS)
+    if len(chunks) == 1:
+        return chunks[0]
+    index = chunks[0].index.append([chunk.index for chunk in chunks[1:]])
+    columns = {}
+    for column in list(chunks[0].columns):
+        parts = [chunk.pop(column) for chunk in chunks]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            values = union_categoricals(parts)
+        else:
+            values = pd.concat(parts).array
+        del parts
+        columns[column] = values
+    return pd.DataFrame(columns, index=index)
+
+
+def row_keys(df):
+    """ROW_KEY values as the plain array row labels are built from."""
+    return df[ROW_KEY].to_numpy()
+
+
+def keyed(df):
+    """Label rows by ROW_KEY when it's unique, so indexes survive rows being added or removed."""
+    if ROW_KEY in df and df[ROW_KEY].notna().all() and df[ROW_KEY].is_unique:
+        df = df.set_index(row_keys(df))
+    else:
+        df = df.reset_index(drop=True)
+    return df
+
+
+class CatalogDiff:
+    """Row labels added, removed and changed between two versions of an export."""
+
+    def __init__(self, added=(), removed=(), changed=(), full=False):
+        self.added = list(added)
+        self.removed = list(removed)
+        self.changed = list(changed)
+        self.full = full  # Rows can't be matched up, so everything is reindexed
+
+    def __bool__(self):
+        return self.full or bool(self.added or self.removed or self.changed)
+
+    def __str__(self):
+        if self.full:
+            return "reloaded"
+        return f"{len(self.added)} added, {len(self.removed)} removed, {len(self.changed)} changed"
+
+
+def diff_frames(old, new):
+    """Compare two keyed frames row by row on their labels."""
+    if not (ROW_KEY in old and ROW_KEY in new) or list(old.columns) != list(new.columns):
+        return CatalogDiff(full=True)
+    # Compared as arrays: an Int64 column and the int64 labels built from it aren't equal Indexes
+    if not (new.index.is_unique and np.array_equal(new.index.to_numpy(), row_keys(new))):
+        return CatalogDiff(full=True)
+
+    old_hashes = pd.util.hash_pandas_object(old, index=False)
+    new_hashes = pd.util.hash_pandas_object(new, index=False)
+    common = old.index.intersection(new.index)
+    changed = common[old_hashes.loc[common].to_numpy() != new_hashes.loc[common].to_numpy()]
+    return CatalogDiff(
+        added=new.index.difference(old.index),
+        removed=old.index.difference(new.index),
+        changed=changed,
+    )
+
+
+def add_sorted(values, value):
+    """Insert into a sorted list."""
+    insort(values, value)
+
+
+def remove_sorted(values, value):
+    """Remove from a sorted list, if present."""
+    position = bisect_left(values, value)
+    if position < len(values) and values[position] == value:
+        del values[position]
+
+
+class Catalog:
+    """Inventory export with hash indexes for the GUI's lookups.
+
+    Indexes hold row labels (the Store Part ID when it's unique), so a newer
+    export can be applied with apply_changes() by touching only the rows that
+    differ.
+    """
+
+    def __init__(self, df=None):
+        self.df = None
+        self.by_part_number = LabelIndex()
+        self.by_part_id = LabelIndex()
+        self.by_upc = LabelIndex()
+
+        # Row counts per (store, bin) and per combobox value, so entries can be
+        # dropped when their last row goes away
+        self.bin_counts = {}
+        self.value_counts = {column: {} for column in COUNTED_COLUMNS}
+
+        if df is not None:
+            df = keyed(df)
+            self.add_chunk(df)
+            self.finish(df)
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """Count an export chunk by chunk as it streams in, then index the compact combined frame."""
+        catalog = cls()
+        parts = []
+        offset = 0
+        for chunk in chunks:
+            if ROW_KEY in chunk and chunk[ROW_KEY].notna().all():
+                chunk.index = pd.Index(row_keys(chunk))
+            else:
+                chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            catalog.add_chunk(chunk)
+            parts.append(chunk)
+
+        df = combine_chunks(parts)
+        del parts
+        if not df.index.equals(keyed(df).index):
+            # Row keys turned out missing or repeated across chunks; label by position instead
+            return cls(df)
+        catalog.finish(df)
+        return catalog
+
+    def add_chunk(self, chunk):
+        """Fold a chunk of rows into the counts."""
+        if 'Store Name' in chunk and 'Bin Location' in chunk:
+            bins = chunk[['Store Name', 'Bin Location']].dropna()
+            merge_counts(self.bin_counts, bins.value_counts(sort=False))
+        for column in COUNTED_COLUMNS:
+            if column in chunk:
+                merge_counts(self.value_counts[column], chunk[column].value_counts(sort=False))
+
+    def finish(self, df):
+        """Build the lookup indexes, sorted lists and autocomplete indexes once every row is counted."""
+        self.df = df
+        self.by_part_number = build_index(df, 'Part Number')
+        self.by_part_id = build_index(df, 'Part ID')
+        self.by_upc = build_index(df, 'UPC', skip=(0, "0"))  # UPC 0 means no UPC
+
+        # Precomputed sorted bin list per store
+        self.bins_by_store = {}
+        for store, bin_location in self.bin_counts:
+            self.bins_by_store.setdefault(store, []).append(bin_location)
+        for store_bins in self.bins_by_store.values():
+            store_bins.sort()
+
+        # Combobox lists; branches stay in export order
+        self.products_ids = self.by_part_id.distinct.tolist()
+        self.manufacturer_ids = self.by_part_number.distinct.tolist()
+        self.branches = df['Store Name'].dropna().unique().tolist() if 'Store Name' in df else []
+
+        # Autocomplete indexes; bin indexes are built per store on first use
+        self.manufacturer_index = PrefixIndex(self.manufacturer_ids)
+        self.bin_indexes = {}
+
+    def rows(self, index, key):
+        """Return the rows an index holds for key, as a DataFrame (empty if none)."""
+        with timed("lookup") as details:
+            labels = index.get(index_key(key), [])
+            details["rows"] = len(labels)
+            return self.df.loc[labels]
+
+    def apply_changes(self, new_df, diff=None):
+        """Bring the catalog up to date with a newer export, touching only rows that differ.
+
+        Returns the CatalogDiff applied. Pass a diff computed earlier (e.g. on a
+        background thread) against the keyed frame to skip keying and comparing
+        the frames again. A full diff rebuilds every index here; on the Tk thread,
+        build the new Catalog in the background and replace() this one instead.
+        """
+        if diff is None:
+            new_df = keyed(new_df)
+            diff = diff_frames(self.df, new_df)
+        if diff.full:
+            self.__init__(new_df)
+            return diff
+        if not diff:
+            return diff
+
+        outgoing = self.df.loc[diff.removed + diff.changed]
+        incoming = new_df.loc[diff.added + diff.changed]
+        self.unindex_rows(outgoing)
+        self.df = new_df
+        self.index_rows(incoming)
+        return diff
+
+    def replace(self, other):
+        """Take over another catalog's frame and indexes, e.g. one rebuilt off the Tk thread."""
+        self.__dict__.update(other.__dict__)
+
+    def index_rows(self, rows):
+        """Add rows to the lookup indexes and combobox lists."""
+        self.update_indexes(rows, 1)
+
+    def unindex_rows(self, rows):
+        """Remove rows from the lookup indexes and combobox lists."""
+        self.update_indexes(rows, -1)
+
+    def update_indexes(self, rows, delta):
+        """Add (delta=1) or remove (delta=-1) rows from every index."""
+        # A value enters its combobox list with its first row and leaves with its last
+        for column, index, skip, values in (('Part Number', self.by_part_number, (), self.manufacturer_ids),
+                                            ('Part ID', self.by_part_id, (), self.products_ids),
+                                            ('UPC', self.by_upc, (0, "0"), None)):
+            if column not in rows:
+                continue
+            for label, value in rows[column].items():
+                if pd.isna(value) or value in skip:
+                    continue
+                key = index_key(value)
+                if delta > 0:
+                    index.add(key, label)
+                    if values is not None and len(index[key]) == 1:
+                        self.add_list_value(column, values, value)
+                else:
+                    index.remove(key, label)
+                    if values is not None and key not in index:
+                        self.remove_list_value(column, values, value)
+
+        if 'Store Name' in rows:
+            counts = self.value_counts['Store Name']
+            for value in rows['Store Name'].dropna():
+                count = counts.get(value, 0) + delta
+                if count > 0:
+                    counts[value] = count
+                else:
+                    counts.pop(value, None)
+                if count == 1 and delta > 0:
+                    self.add_list_value('Store Name', self.branches, value)
+                elif count == 0:
+                    self.remove_list_value('Store Name', self.branches, value)
+
+        if 'Store Name' in rows and 'Bin Location' in rows:
+            for store, bin_location in rows[['Store Name', 'Bin Location']].dropna().itertuples(index=False):
+                count = self.bin_counts.get((store, bin_location), 0) + delta
+                if count > 0:
+                    self.bin_counts[(store, bin_location)] = count
+                else:
+                    self.bin_counts.pop((store, bin_location), None)
+                store_bins = self.bins_by_store.setdefault(store, [])
+                if count == 1 and delta > 0:
+                    add_sorted(store_bins, bin_location)
+                elif count == 0:
+                    remove_sorted(store_bins, bin_location)
+                    if not store_bins:
+                        del self.bins_by_store[store]
+                self.bin_indexes.pop(store, None)  # Rebuilt on next use
+
+    def add_list_value(self, column, values, value):
+        """A value gained its first row: add it to its combobox list."""
+        if column == 'Store Name':
+            values.append(value)  # Branches stay in export order
+            return
+        add_sorted(values, value)
+        if column == 'Part Number':
+            self.manufacturer_index.add(value)
+
+    def remove_list_value(self, column, values, value):
+        """A value lost its last row: drop it from its combobox list."""
+        if column == 'Store Name':
+            if value in values:
+                values.remove(value)
+            return
+        remove_sorted(values, value)
+        if column == 'Part Number':
+            self.manufacturer_index.remove(value)
+
+    def parts_for_number(self, part_number):
+        """Rows for a manufacturer Part Number."""
+        return self.rows(self.by_part_number, part_number)
+
+    def parts_for_id(self, part_id):
+        """Rows for an internal Part ID."""
+        return self.rows(self.by_part_id, part_id)
+
+    def parts_for_upc(self, upc):
+        """Rows for a UPC."""
+        return self.rows(self.by_upc, upc)
+
+    def lookup(self, code):
+        """Rows for a scanned or typed code, trying Part Number, then Part ID, then UPC."""
+        for index in (self.by_part_number, self.by_part_id, self.by_upc):
+            if index_key(code) in index:
+                return self.rows(index, code)
+        return self.df.iloc[[]]
+
+    def bins_for_store(self, store):
+        """Sorted bin locations for a store."""
+        return self.bins_by_store.get(store, [])
+
+    def bin_index(self, store):
+        """Autocomplete index over a store's bins."""
+        index = self.bin_indexes.get(store)
+        if index is None:
+            index = PrefixIndex(self.bins_for_store(store))
+            self.bin_indexes[store] = index
+        return index
+
+
+def file_sha1(path):
+    """SHA-1 of a file's contents, read in 1 MB blocks."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_base(csv_path, cache_dir):
+    """Cache file prefix for an export, keyed by file name.
+
+    Not by full path: a onefile build extracts data.csv to a new temporary
+    directory on every launch, and the content hash already guards reuse.
+    """
+    name = hashlib.sha1(os.path.basename(csv_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"catalog-{name}")
+
+
+def prune_catalog_cache(cache_dir=CACHE_DIR, keep=CACHE_ENTRIES):
+    """Delete all but the keep most recently used cache entries."""
+    metas = glob.glob(os.path.join(cache_dir, "catalog-*.json"))
+    metas.sort(key=os.path.getmtime, reverse=True)
+    for meta_path in metas[keep:]:
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                data_path = json.load(f).get("path")
+        except (OSError, ValueError):
+            data_path = None
+        for path in (meta_path, data_path):
+            if path and os.path.dirname(os.path.abspath(path)) == os.path.abspath(cache_dir):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+def read_cached_frame(data_path, fmt):
+    """Load a cached frame, memory-mapping it when it's Feather."""
+    if fmt == "feather":
+        import pyarrow.feather as feather
+        return feather.read_table(data_path, memory_map=True).to_pandas()
+    return pd.read_pickle(data_path)
+
+
+def write_cached_frame(df, base_path):
+    """Write the frame as Feather when pyarrow is installed, otherwise as a pickle."""
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        fmt, data_path = "pickle", base_path + ".pkl"
+        df.to_pickle(data_path + ".tmp")
+    else:
+        fmt, data_path = "feather", base_path + ".feather"
+        feather.write_feather(df, data_path + ".tmp", compression="uncompressed")
+    os.replace(data_path + ".tmp", data_path)
+    return fmt, data_path
+
+
+def cached_catalog_frame(csv_path, cache_dir=CACHE_DIR):
+    """Return (frame, CSV hash) from the binary cache, or (None, hash if computed) when it's stale.
+
+    The cache is trusted when the same file's mtime and size match. Otherwise the CSV's
+    hash decides, so a copied or re-extracted but identical file still hits.
+    """
+    stat = os.stat(csv_path)
+    base_path = cache_base(csv_path, cache_dir)
+    meta_path = base_path + ".json"
+
+    meta = None
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    csv_hash = None
+    if meta and meta.get("columns") == CATALOG_COLUMNS and meta.get("dtypes") == CATALOG_DTYPES:
+        unchanged = (meta.get("source") == os.path.abspath(csv_path)
+                     and meta.get("mtime") == stat.st_mtime and meta.get("size") == stat.st_size)
+        if not unchanged:
+            csv_hash = file_sha1(csv_path)
+            unchanged = meta.get("sha1") == csv_hash
+        if unchanged:
+            try:
+                df = read_cached_frame(meta["path"], meta["format"])
+            except Exception as e:
+                print(f"Ignoring unreadable catalog cache: {e}")
+            else:
+                if meta.get("source") != os.path.abspath(csv_path) or meta.get("mtime") != stat.st_mtime:
+                    meta.update(source=os.path.abspath(csv_path), mtime=stat.st_mtime, size=stat.st_size)
+                    write_meta(meta_path, meta)
+                return df, csv_hash
+    return None, csv_hash
+
+
+def cache_catalog_frame(df, csv_path, csv_hash=None, cache_dir=CACHE_DIR):
+    """Store a parsed export in the binary cache for the next load."""
+    stat = os.stat(csv_path)
+    base_path = cache_base(csv_path, cache_dir)
+    meta_path = base_path + ".json"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fmt, data_path = write_cached_frame(df, base_path)
+        write_meta(meta_path, {
+            "source": os.path.abspath(csv_path),
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "sha1": csv_hash or file_sha1(csv_path),
+            "columns": CATALOG_COLUMNS,
+            "dtypes": CATALOG_DTYPES,
+            "format": fmt,
+            "path": data_path,
+        })
+        prune_catalog_cache(cache_dir)
+    except Exception as e:
+        print(f"Failed to write catalog cache: {e}")
+
+
+def load_catalog_frame(csv_path, cache_dir=CACHE_DIR):
+    """Read the catalog columns of an export, reusing a binary cache while the CSV is unchanged."""
+    df, csv_hash = cached_catalog_frame(csv_path, cache_dir)
+    if df is None:
+        df = combine_chunks(list(read_catalog_chunks(csv_path)))
+        cache_catalog_frame(df, csv_path, csv_hash, cache_dir)
+    return df
+
+
+def write_meta(meta_path, meta):
+    """Write cache metadata atomically so a crash can't leave a half-written file."""
+    temp_path = meta_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(temp_path, meta_path)
+
+
+def load_catalog(csv_path, cache_dir=CACHE_DIR):
+    """Load an export through the binary cache and index it, streaming the CSV on a cache miss."""
+    df, csv_hash = cached_catalog_frame(csv_path, cache_dir)
+    if df is not None:
+        return Catalog(df)
+    catalog = Catalog.from_chunks(read_catalog_chunks(csv_path))
+    cache_catalog_frame(catalog.df, csv_path, csv_hash, cache_dir)
+    return catalog
@@ -0,0 +1,117 @@
+import glob
+import os
+import queue
+import threading
+import time
+from catalog import CACHE_DIR, Catalog, diff_frames, keyed, load_catalog_frame
+
+
+# Seconds between checks for a new or changed export
+WATCH_INTERVAL = 5
+
+# Directory where new exports are dropped; the newest CSV in it is used
+DROP_DIR_ENV = "LABEL_CATALOG_DROP_DIR"
+
+
+def newest_export(path):
+    """The export to load: path itself, or the most recently modified CSV in a drop directory."""
+    if not os.path.isdir(path):
+        return path if os.path.exists(path) else None
+    exports = glob.glob(os.path.join(path, "*.csv"))
+    return max(exports, key=os.path.getmtime) if exports else None
+
+
+def export_signature(csv_path):
+    """(path, mtime, size) of an export, or None if it's gone."""
+    try:
+        stat = os.stat(csv_path)
+    except OSError:
+        return None
+    return csv_path, stat.st_mtime, stat.st_size
+
+
+class CatalogWatcher:
+    """Polls an export (or a drop directory of exports) and diffs new versions off the Tk thread.
+
+    Each change is loaded through the catalog cache and compared with the
+    current catalog on a background thread. The (new frame, diff) pair is
+    then handed to the Tk thread by poll(), which applies it with
+    Catalog.apply_changes so the indexes only change on one thread. When
+    rows can't be matched up, the whole replacement catalog is built on the
+    background thread and poll() only swaps it in.
+    """
+
+    def __init__(self, catalog, path, interval=WATCH_INTERVAL, cache_dir=CACHE_DIR):
+        self.catalog = catalog
+        self.path = path
+        self.interval = interval
+        self.cache_dir = cache_dir
+        self.changes = queue.Queue()
+        self.applied = threading.Event()
+        self.applied.set()
+        self.stopped = threading.Event()
+        self.signature = export_signature(newest_export(path) or "")
+        self.thread = threading.Thread(target=self.watch_loop, name="catalog-watcher", daemon=True)
+
+    def start(self):
+        """Start polling."""
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop polling after the current check."""
+        self.stopped.set()
+
+    def check(self):
+        """Load and diff the export if it changed since the last check; returns the diff or None."""
+        csv_path = newest_export(self.path)
+        signature = export_signature(csv_path) if csv_path else None
+        if signature is None or signature == self.signature:
+            return None
+
+        # An export that is still being written keeps growing; wait for it to settle
+        time.sleep(min(1.0, self.interval))
+        if export_signature(csv_path) != signature:
+            return None
+
+        new_df = keyed(load_catalog_frame(csv_path, self.cache_dir))
+        diff = diff_frames(self.catalog.df, new_df)
+        self.signature = signature
+        if diff:
+            # Reindexing everything would block the GUI, so a full reload is built here
+            rebuilt = Catalog(new_df) if diff.full else None
+            self.applied.clear()
+            self.changes.put((csv_path, new_df, diff, rebuilt))
+        return diff
+
+    def watch_loop(self):
+        """Check for changes every interval seconds until stopped."""
+        while not self.stopped.wait(self.interval):
+            # Diffs are taken against the catalog as it is, so wait for the last one to land
+            self.applied.wait()
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Failed to reload catalog: {e}")
+
+    def apply_pending(self):
+        """Apply queued changes to the catalog; returns [(csv path, diff)] for what was applied."""
+        applied = []
+        while True:
+            try:
+                csv_path, new_df, diff, rebuilt = self.changes.get_nowait()
+            except queue.Empty:
+                break
+            if rebuilt is not None:
+                self.catalog.replace(rebuilt)
+            else:
+                self.catalog.apply_changes(new_df, diff)
+            applied.append((csv_path, diff))
+            self.applied.set()
+        return applied
+
+    def poll(self, root, callback, interval=500):
+        """Apply changes on the Tk thread and call callback(csv path, diff) for each, via root.after."""
+        for csv_path, diff in self.apply_pending():
+            callback(csv_path, diff)
+        root.after(interval, self.poll, root, callback, interval)
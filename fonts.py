@@ -0,0 +1,76 @@
+import os
+from PIL import ImageFont
+
+
+# Font files tried in order when a family can't be resolved by name (e.g. Linux
+# print hosts without Helvetica). LABEL_FONT_PATH, separated by os.pathsep, is tried first.
+FALLBACK_FONT_PATHS = [
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+    "/usr/share/fonts/liberation-sans/LiberationSans-Regular.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/Library/Fonts/Arial.ttf",
+    "C:\\Windows\\Fonts\\arial.ttf",
+]
+
+# Loaded faces keyed by (family, size), and the file each family resolved to
+font_cache = {}
+resolved_fonts = {}
+font_stats = {"hits": 0, "misses": 0}
+
+
+def set_font_fallbacks(paths):
+    """Replace the fallback font file list and drop anything resolved through it."""
+    FALLBACK_FONT_PATHS[:] = paths
+    clear_font_cache()
+
+
+def font_candidates(family):
+    """List the names and paths to try for a font family, in order."""
+    env_paths = [path for path in os.environ.get("LABEL_FONT_PATH", "").split(os.pathsep) if path]
+    return [family] + env_paths + FALLBACK_FONT_PATHS
+
+
+def load_font(family, size):
+    """Load a TrueType face by name, falling back to the configured font files."""
+    resolved = resolved_fonts.get(family)
+    if resolved is not None:
+        return ImageFont.truetype(resolved, size=size)
+
+    for candidate in font_candidates(family):
+        try:
+            font = ImageFont.truetype(candidate, size=size)
+        except OSError:
+            continue
+        resolved_fonts[family] = candidate
+        return font
+
+    print(f"Font {family} not found, using the default font.")
+    return ImageFont.load_default(size=size)
+
+
+def get_font(family, size):
+    """Return a shared font object for (family, size), loading it once per process."""
+    key = (family, size)
+    font = font_cache.get(key)
+    if font is not None:
+        font_stats["hits"] += 1
+        return font
+
+    font_stats["misses"] += 1
+    font = load_font(family, size)
+    font_cache[key] = font
+    return font
+
+
+def font_cache_stats():
+    """Return font cache hit/miss counters and the number of loaded faces."""
+    return {"hits": font_stats["hits"], "misses": font_stats["misses"], "size": len(font_cache)}
+
+
+def clear_font_cache():
+    """Forget every loaded face and reset the counters."""
+    font_cache.clear()
+    resolved_fonts.clear()
+    font_stats["hits"] = 0
+    font_stats["misses"] = 0
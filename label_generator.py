@@ -1,253 +1,486 @@
+import os
+import pickle
 import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
 import qrcode
 import barcode
 from barcode.writer import ImageWriter
-from PIL import Image, ImageDraw, ImageFont
-import os
-from zebrafy import ZebrafyImage
+from PIL import Image, ImageChops, ImageDraw
+from fonts import get_font
+from telemetry import timed
 
 
 
-def generate_codes(qr_data, barcode_data=None):
-    """Generate a QR code and optionally a barcode, and return their file paths."""
-    qr_temp = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-    qr_file = qr_temp.name
+DPI = 203
+
+
+QR_ERROR_CORRECTION = {
+    "L": qrcode.constants.ERROR_CORRECT_L,
+    "M": qrcode.constants.ERROR_CORRECT_M,
+    "Q": qrcode.constants.ERROR_CORRECT_Q,
+    "H": qrcode.constants.ERROR_CORRECT_H,
+}
+
+# Canvas mode for rendered labels: "L" keeps anti-aliased text for the dither/threshold
+# stage in zpl.binarize, "1" draws bilevel dots directly. Either is 1 byte per pixel or less.
+LABEL_MODE = os.environ.get("LABEL_RENDER_MODE", "L")
+
+# Quiet zones in modules around the symbols drawn onto labels
+QR_BORDER = 2
+CODE128_QUIET_ZONE = 10
 
-    # Generate QR Code
+# Bounded LRU of finished symbol bitmaps keyed by (symbology, data, error correction, size)
+SYMBOL_CACHE_SIZE = 1024
+SYMBOL_CACHE_FILE = os.path.join(
+    os.environ.get("LABEL_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "printer")),
+    "symbols.pkl",
+)
+symbol_cache = OrderedDict()
+symbol_stats = {"hits": 0, "misses": 0}
+symbol_lock = threading.Lock()
+
+
+def make_qr_image(qr_data, error_correction="H"):
+    """Generate a QR code image at the encoder's native box size."""
     qr = qrcode.QRCode(
         version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_H,
+        error_correction=QR_ERROR_CORRECTION[error_correction],
         box_size=10,
-        border=2,
+        border=QR_BORDER,
     )
     qr.add_data(qr_data)
     qr.make(fit=True)
-    qr_img = qr.make_image(fill="black", back_color="white")
-    qr_img.save(qr_file)
+    return qr.make_image(fill="black", back_color="white").get_image()
 
-    barcode_file = None
+
+def make_code128_image(barcode_data):
+    """Generate a Code128 barcode image without the human-readable text."""
+    barcode_class = barcode.get_barcode_class('code128')
+    code128 = barcode_class(barcode_data, writer=ImageWriter())
+    return code128.render({"write_text": False})
+
+
+def generate_code_images(qr_data, barcode_data=None):
+    """Generate a QR code and optionally a barcode as in-memory PIL images."""
+    qr_img = make_qr_image(qr_data)
+
+    barcode_img = None
     if barcode_data:  # Only generate barcode if data is provided
-        barcode_temp = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-        barcode_file = barcode_temp.name
+        barcode_img = make_code128_image(barcode_data)
+
+    return qr_img, barcode_img
+
+
+def cached_symbol(key, build):
+    """Return the symbol bitmap for key from the LRU cache, building it on a miss."""
+    with timed("symbol", symbology=key[0]) as details:
+        with symbol_lock:
+            image = symbol_cache.get(key)
+            if image is not None:
+                symbol_cache.move_to_end(key)
+                symbol_stats["hits"] += 1
+                details["cache_hit"] = True
+                return image
+            symbol_stats["misses"] += 1
+
+        details["cache_hit"] = False
+        image = build()
+        with symbol_lock:
+            symbol_cache[key] = image
+            while len(symbol_cache) > SYMBOL_CACHE_SIZE:
+                symbol_cache.popitem(last=False)
+        return image
+
+
+def modules_to_image(modules, module_size, slot_size):
+    """Draw a boolean module matrix (True = dark) at an integer module size, centered in a 1-bit slot.
+
+    A symbol with more modules than the slot has dots is resampled into the slot
+    instead, as the original resize did; it prints but may not scan.
+    """
+    if modules.shape[0] > slot_size[1] or modules.shape[1] > slot_size[0]:
+        symbol = Image.fromarray(np.where(modules, 0, 255).astype(np.uint8))
+        return symbol.resize(slot_size, resample=Image.NEAREST)  # Hard-edged bars, no grey
+    dots = np.repeat(np.repeat(modules, module_size[1], axis=0), module_size[0], axis=1)
+    slot = np.ones((slot_size[1], slot_size[0]), dtype=bool)  # Mode "1": True is white
+    top = (slot_size[1] - dots.shape[0]) // 2
+    left = (slot_size[0] - dots.shape[1]) // 2
+    slot[top:top + dots.shape[0], left:left + dots.shape[1]] = ~dots
+    return Image.fromarray(slot)
+
+
+def render_qr(qr_data, size, error_correction="H"):
+    """Draw a QR code straight onto the dot grid with the largest whole-dot module that fits."""
+    qr = qrcode.QRCode(error_correction=QR_ERROR_CORRECTION[error_correction], border=QR_BORDER)
+    qr.add_data(qr_data)
+    qr.make(fit=True)
+    modules = np.array(qr.get_matrix(), dtype=bool)
+    module = max(1, size // modules.shape[0])
+    return modules_to_image(modules, (module, module), (size, size))
+
+
+def render_code128(barcode_data, width, height):
+    """Draw Code128 bars straight onto the dot grid with the widest whole-dot module that fits."""
+    bars = barcode.get_barcode_class('code128')(barcode_data).build()[0]
+    modules = np.array([bar == "1" for bar in bars], dtype=bool)
+    quiet = np.zeros(CODE128_QUIET_ZONE, dtype=bool)
+    modules = np.concatenate([quiet, modules, quiet])[np.newaxis, :]
+    module = max(1, width // modules.shape[1])
+    return modules_to_image(modules, (module, height), (width, height))
+
+
+def qr_symbol(qr_data, size, error_correction="H"):
+    """QR code bitmap for a size x size slot, shared between labels with the same data."""
+    key = ("qr", str(qr_data), error_correction, (size, size))
+    return cached_symbol(key, lambda: render_qr(qr_data, size, error_correction))
+
+
+def code128_symbol(barcode_data, width, height):
+    """Code128 bitmap for a width x height slot, shared between labels with the same data."""
+    key = ("code128", str(barcode_data), None, (width, height))
+    return cached_symbol(key, lambda: render_code128(barcode_data, width, height))
+
+
+def symbol_cache_stats():
+    """Return symbol cache hit/miss counters and the number of cached bitmaps."""
+    with symbol_lock:
+        return {"hits": symbol_stats["hits"], "misses": symbol_stats["misses"], "size": len(symbol_cache)}
+
+
+def clear_symbol_cache():
+    """Drop every cached symbol and reset the counters."""
+    with symbol_lock:
+        symbol_cache.clear()
+        symbol_stats["hits"] = 0
+        symbol_stats["misses"] = 0
+
+
+def save_symbol_cache(path=SYMBOL_CACHE_FILE):
+    """Persist the cached symbols so the next session starts warm."""
+    from zpl_cache import LAYOUT_VERSION  # zpl_cache imports this module, so not at the top
+    with symbol_lock:
+        entries = list(symbol_cache.items())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump({"version": LAYOUT_VERSION, "entries": entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"Failed to save symbol cache: {e}")
+
+
+def load_symbol_cache(path=SYMBOL_CACHE_FILE):
+    """Load symbols saved by save_symbol_cache, discarding them if the rendering code has changed since."""
+    from zpl_cache import LAYOUT_VERSION
+    try:
+        with open(path, "rb") as f:
+            saved = pickle.load(f)
+    except FileNotFoundError:
+        return
+    except Exception as e:
+        print(f"Ignoring unreadable symbol cache: {e}")
+        return
+    if not isinstance(saved, dict) or saved.get("version") != LAYOUT_VERSION:
+        # Drawn by another version of the renderer
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return
+    entries = saved["entries"]
+    with symbol_lock:
+        for key, image in entries[-SYMBOL_CACHE_SIZE:]:
+            symbol_cache[key] = image
+
+
+def generate_codes(qr_data, barcode_data=None):
+    """Generate a QR code and optionally a barcode, and return their file paths."""
+    qr_img, barcode_img = generate_code_images(qr_data, barcode_data)
+
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as qr_temp:
+        qr_file = qr_temp.name
+    qr_img.save(qr_file)
 
-        # Generate Barcode
-        barcode_class = barcode.get_barcode_class('code128')
-        code128 = barcode_class(barcode_data, writer=ImageWriter())
-        code128.save(barcode_file[:-4], options={"write_text": False})
+    barcode_file = None
+    if barcode_img:
+        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as barcode_temp:
+            barcode_file = barcode_temp.name
+        barcode_img.save(barcode_file)
 
     return qr_file, barcode_file
 
 
-def create_1x2_product_label(
-    qr_data,
-    barcode_data=None,
-    description="",
-    bin_location="",
-    product_code="",
-    title=""
-):
-    """Create a 1x2 product label."""
-    dpi = 203
-    label_width_px = int(2 * dpi)  # 1x2 label
-    label_height_px = int(1 * dpi)
+def save_label(label, dpi=DPI):
+    """Save a rendered label image to a temporary PNG and return its path."""
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as temp_file:
+        temp_path = temp_file.name
+        label.save(temp_path, dpi=(dpi, dpi))
+    return temp_path
 
-    # Generate QR and optionally barcode
-    qr_file, barcode_file = generate_codes(qr_data, barcode_data)
 
-    # Create label template
-    label = Image.new("RGB", (label_width_px, label_height_px), "white")
-    draw = ImageDraw.Draw(label)
+def wrap_text(text, max_line_length):
+    """Split text into fixed-width lines for the label text areas."""
+    return [text[i:i + max_line_length] for i in range(0, len(text), max_line_length)]
+
 
-    # Add Title
-    font_title = ImageFont.truetype("Helvetica", size=int(0.1 * label_height_px))
+def build_background(label_width_px, label_height_px, title, font_title, title_y, mode=LABEL_MODE):
+    """Create a blank label canvas with the centered title already drawn."""
+    background = Image.new(mode, (label_width_px, label_height_px), "white")
+    draw = ImageDraw.Draw(background)
     title_x = (label_width_px - draw.textlength(title, font=font_title)) / 2
-    draw.text((title_x, int(label_height_px * 0.05)), title, fill="black", font=font_title)
+    draw.text((title_x, title_y), title, fill="black", font=font_title)
+    return background
 
-    # Add QR Code
-    qr_img = Image.open(qr_file)
+
+def static_rows(background):
+    """Height of the band at the top of a background that holds its static content (the title)."""
+    bbox = ImageChops.invert(background.convert("L")).getbbox()
+    return bbox[3] if bbox else 0
+
+
+def build_product_layout(title, dpi, width_in, bin_font_scale, max_bin_line_length, bin_gap,
+                         barcode_width_scale, max_desc_line_length, mode=LABEL_MODE):
+    """Compute the static background and slot geometry for a product label."""
+    label_width_px = int(width_in * dpi)
+    label_height_px = int(1 * dpi)
+
+    # Title
+    font_title = get_font("Helvetica", int(0.1 * label_height_px))
+    title_y = int(label_height_px * 0.05)
+    background = build_background(label_width_px, label_height_px, title, font_title, title_y, mode)
+
+    # QR Code
     qr_width = int(label_height_px * 0.5)
-    qr_img = qr_img.resize((qr_width, qr_width))
     qr_x = int(label_width_px * 0.05)
     qr_y = int(label_height_px * 0.15)
-    label.paste(qr_img, (qr_x, qr_y))
+
+    # Barcode
+    barcode_width = int(label_width_px * barcode_width_scale)
+    barcode_height = int(label_height_px * 0.3)
+    barcode_x = int(label_width_px * 0.55)
+    barcode_y = int(label_height_px * 0.2)
+
+    return {
+        "background": background,
+        "static_rows": static_rows(background),
+        "label_size": (label_width_px, label_height_px),
+        "font_title": font_title,
+        "title_y": title_y,
+        "qr_size": qr_width,
+        "qr_pos": (qr_x, qr_y),
+        "font_bin": get_font("Helvetica", int(bin_font_scale * label_height_px)),
+        "max_bin_line_length": max_bin_line_length,
+        "bin_pos": (qr_x, qr_y + qr_width + bin_gap),
+        "barcode_size": (barcode_width, barcode_height),
+        "barcode_pos": (barcode_x, barcode_y),
+        "font_barcode_text": get_font("Helvetica", int(0.08 * label_height_px)),
+        "barcode_text_y": barcode_y + barcode_height + 5,
+        "font_desc": get_font("Helvetica", int(0.08 * label_height_px)),
+        "max_desc_line_length": max_desc_line_length,
+        "desc_y": label_height_px * 0.625,
+    }
+
+
+def build_1x2_layout(title, dpi, mode=LABEL_MODE):
+    """Compute the 1x2 product label template."""
+    return build_product_layout(title, dpi, width_in=2, bin_font_scale=0.08, max_bin_line_length=18,
+                                bin_gap=2, barcode_width_scale=0.45, max_desc_line_length=20, mode=mode)
+
+
+def build_1x3_layout(title, dpi, mode=LABEL_MODE):
+    """Compute the 1x3 product label template."""
+    return build_product_layout(title, dpi, width_in=3, bin_font_scale=0.09, max_bin_line_length=22,
+                                bin_gap=5, barcode_width_scale=0.4, max_desc_line_length=32, mode=mode)
+
+
+def build_2x4_layout(title, dpi, mode=LABEL_MODE):
+    """Compute the 2x4 shelf label template."""
+    label_width_px = int(4 * dpi)  # 4 inches wide
+    label_height_px = int(2 * dpi)  # 2 inches tall
+
+    # Title (Top Center)
+    font_title = get_font("Helvetica", int(0.1 * label_height_px))
+    title_y = int(label_height_px * 0.03)
+    background = build_background(label_width_px, label_height_px, title, font_title, title_y, mode)
+
+    # QR Code aligned to the right side
+    qr_width = int(label_height_px * 0.65)
+    qr_x = int(label_width_px - qr_width - (label_width_px * 0.05))
+    qr_y = int(label_height_px * 0.25)
+
+    # Bin Location Value below the "Bin #:" label slot
+    font_bin_label = get_font("Helvetica", int(0.16 * label_height_px))
+    bin_label_x = int(label_width_px * 0.05)  # Align to left margin
+    bin_label_y = int(label_height_px * 0.15)  # Adjusted for spacing
+    font_bin_value = get_font("Helvetica", int(0.3 * label_height_px))
+
+    return {
+        "background": background,
+        "static_rows": static_rows(background),
+        "label_size": (label_width_px, label_height_px),
+        "font_title": font_title,
+        "title_y": title_y,
+        "qr_size": qr_width,
+        "qr_pos": (qr_x, qr_y),
+        "font_bin_value": font_bin_value,
+        "max_chars_per_line": 5,  # Characters before wrapping
+        "bin_value_pos": (bin_label_x, bin_label_y + font_bin_label.size + 5),
+        "line_height": font_bin_value.size + 2,
+    }
+
+
+LAYOUT_BUILDERS = {
+    "1x2": build_1x2_layout,
+    "1x3": build_1x3_layout,
+    "2x4": build_2x4_layout,
+}
+
+# Bounded LRU of precompiled label templates keyed by (label type, title, dpi, mode). Titles
+# are Provider names (hundreds per export) and a 1x3 "L" background is ~124 KB, so only the
+# recently used ones are kept
+LAYOUT_CACHE_SIZE = 32
+layout_cache = OrderedDict()
+layout_lock = threading.Lock()
+
+
+def get_layout(label_type, title, dpi=DPI, mode=LABEL_MODE):
+    """Return the cached template for a label type, building it on first use."""
+    key = (label_type, title, dpi, mode)
+    with timed("layout", label=label_type) as details:
+        with layout_lock:
+            layout = layout_cache.get(key)
+            if layout is not None:
+                layout_cache.move_to_end(key)
+        details["cache_hit"] = layout is not None
+        if layout is None:
+            layout = LAYOUT_BUILDERS[label_type](title, dpi, mode)
+            with layout_lock:
+                layout_cache[key] = layout
+                while len(layout_cache) > LAYOUT_CACHE_SIZE:
+                    layout_cache.popitem(last=False)
+    return layout
+
+
+def render_product_label(layout, qr_data, barcode_data, description, bin_location, product_code):
+    """Composite the per-item QR, barcode and text onto a product label template."""
+    label = layout["background"].copy()
+    draw = ImageDraw.Draw(label)
+
+    # Add QR Code
+    qr_width = layout["qr_size"]
+    qr_x, qr_y = layout["qr_pos"]
+    label.paste(qr_symbol(qr_data, qr_width), (qr_x, qr_y))
 
     # Add Bin Location (below QR code)
-    font_bin = ImageFont.truetype("Helvetica", size=int(0.08 * label_height_px))
-    max_bin_line_length = 18  # Max characters before wrapping
-    wrapped_bin_lines = [bin_location[i:i + max_bin_line_length] for i in range(0, len(bin_location), max_bin_line_length)]
-    bin_x = qr_x
-    bin_y = qr_y + qr_width + 2
-    for i, line in enumerate(wrapped_bin_lines):
+    font_bin = layout["font_bin"]
+    bin_x, bin_y = layout["bin_pos"]
+    for i, line in enumerate(wrap_text(bin_location, layout["max_bin_line_length"])):
         draw.text((bin_x, bin_y + i * (font_bin.size + 2)), line, fill="black", font=font_bin)
 
     # Add Barcode if exists
-    if barcode_file:
-        barcode_img = Image.open(barcode_file)
-        barcode_width = int(label_width_px * 0.45)
-        barcode_height = int(label_height_px * 0.3)
-        barcode_img = barcode_img.resize((barcode_width, barcode_height))
-        barcode_x = int(label_width_px * 0.55)
-        barcode_y = int(label_height_px * 0.2)
-        label.paste(barcode_img, (barcode_x, barcode_y))
+    barcode_x, barcode_y = layout["barcode_pos"]
+    if barcode_data:
+        barcode_width, barcode_height = layout["barcode_size"]
+        label.paste(code128_symbol(barcode_data, barcode_width, barcode_height), (barcode_x, barcode_y))
 
         # Add Barcode Text
-        font_barcode_text = ImageFont.truetype("Helvetica", size=int(0.08 * label_height_px))
+        font_barcode_text = layout["font_barcode_text"]
         text_width = draw.textlength(product_code, font=font_barcode_text)
         text_x = barcode_x + (barcode_width - text_width) / 2
-        text_y = barcode_y + barcode_height + 5
-        draw.text((text_x, text_y), product_code, fill="black", font=font_barcode_text)
+        draw.text((text_x, layout["barcode_text_y"]), product_code, fill="black", font=font_barcode_text)
 
     # Add Description (with wrapping below Barcode Text, flush-aligned)
-    font_desc = ImageFont.truetype("Helvetica", size=int(0.08 * label_height_px))
-    max_desc_line_length = 20
-    wrapped_desc_lines = [description[i:i + max_desc_line_length] for i in range(0, len(description), max_desc_line_length)]
-    desc_x = barcode_x if barcode_file else qr_x
-    desc_y = label_height_px * 0.625
-    for i, line in enumerate(wrapped_desc_lines):
+    font_desc = layout["font_desc"]
+    desc_x = barcode_x if barcode_data else qr_x
+    desc_y = layout["desc_y"]
+    for i, line in enumerate(wrap_text(description, layout["max_desc_line_length"])):
         draw.text((desc_x, desc_y + i * (font_desc.size + 2)), line, fill="black", font=font_desc)
 
-    # Save to temp file
-    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as temp_file:
-        temp_path = temp_file.name
-        label.save(temp_path, dpi=(dpi, dpi))
-
-    # Cleanup temp QR and barcode files
-    os.remove(qr_file)
-    if barcode_file:
-        os.remove(barcode_file)
+    return label
 
-    return temp_path
 
-def create_1x3_product_label(
+def render_1x2_product_label(
     qr_data,
     barcode_data=None,
     description="",
     bin_location="",
     product_code="",
-    title=""
+    title="",
+    dpi=DPI,
+    mode=LABEL_MODE
 ):
-    """Create a 1x3 product label."""
-    dpi = 203
-    label_width_px = int(3 * dpi)  # 1x3 label
-    label_height_px = int(1 * dpi)
+    """Render a 1x2 product label as a PIL image."""
+    layout = get_layout("1x2", title, dpi, mode)
+    return render_product_label(layout, qr_data, barcode_data, description, bin_location, product_code)
 
-    # Generate QR and optionally barcode
-    qr_file, barcode_file = generate_codes(qr_data, barcode_data)
 
-    # Create label template
-    label = Image.new("RGB", (label_width_px, label_height_px), "white")
-    draw = ImageDraw.Draw(label)
+def render_1x3_product_label(
+    qr_data,
+    barcode_data=None,
+    description="",
+    bin_location="",
+    product_code="",
+    title="",
+    dpi=DPI,
+    mode=LABEL_MODE
+):
+    """Render a 1x3 product label as a PIL image."""
+    layout = get_layout("1x3", title, dpi, mode)
+    return render_product_label(layout, qr_data, barcode_data, description, bin_location, product_code)
 
-    # Add Title (Top Center, Smaller Font)
-    font_title = ImageFont.truetype("Helvetica", size=int(0.1 * label_height_px))
-    title_x = (label_width_px - draw.textlength(title, font=font_title)) / 2
-    draw.text((title_x, int(label_height_px * 0.05)), title, fill="black", font=font_title)
 
-    # Add QR Code (Larger Size)
-    qr_img = Image.open(qr_file)
-    qr_width = int(label_height_px * 0.5)  # QR code size
-    qr_img = qr_img.resize((qr_width, qr_width))
-    qr_x = int(label_width_px * 0.05)
-    qr_y = int(label_height_px * 0.15)  # Adjust vertical position
-    label.paste(qr_img, (qr_x, qr_y))
+def render_2x4_shelf_label(bin_location, title, dpi=DPI, mode=LABEL_MODE):
+    """Render a 2x4 shelf label with the Bin #: QR code as a PIL image."""
+    layout = get_layout("2x4", title, dpi, mode)
 
-    # Add Bin Location (below QR code)
-    font_bin = ImageFont.truetype("Helvetica", size=int(0.09 * label_height_px))  # Bin location text size
-    max_bin_line_length = 22  # Max characters before wrapping
-    wrapped_bin_lines = [bin_location[i:i + max_bin_line_length] for i in range(0, len(bin_location), max_bin_line_length)]
-    bin_x = qr_x
-    bin_y = qr_y + qr_width + 5
-    for i, line in enumerate(wrapped_bin_lines):
-        draw.text((bin_x, bin_y + i * (font_bin.size + 2)), line, fill="black", font=font_bin)
+    label = layout["background"].copy()
+    draw = ImageDraw.Draw(label)
 
-    # Add Barcode if exists
-    if barcode_file:
-        barcode_img = Image.open(barcode_file)
-        barcode_width = int(label_width_px * 0.4)
-        barcode_height = int(label_height_px * 0.3)
-        barcode_img = barcode_img.resize((barcode_width, barcode_height))
-        barcode_x = int(label_width_px * 0.55)
-        barcode_y = int(label_height_px * 0.2)
-        label.paste(barcode_img, (barcode_x, barcode_y))
+    # Add QR Code for Bin #
+    label.paste(qr_symbol(bin_location, layout["qr_size"]), layout["qr_pos"])
 
-        # Add Barcode Text
-        font_barcode_text = ImageFont.truetype("Helvetica", size=int(0.08 * label_height_px))
-        text_width = draw.textlength(product_code, font=font_barcode_text)
-        text_x = barcode_x + (barcode_width - text_width) / 2
-        text_y = barcode_y + barcode_height + 5
-        draw.text((text_x, text_y), product_code, fill="black", font=font_barcode_text)
+    # Add Bin Location Value (wrapped if necessary)
+    bin_value_x, bin_value_y = layout["bin_value_pos"]
+    line_height = layout["line_height"]
+    for i, line in enumerate(wrap_text(bin_location, layout["max_chars_per_line"])):
+        draw.text((bin_value_x, bin_value_y + i * line_height), line, fill="black", font=layout["font_bin_value"])
 
-    # Add Description (with wrapping below Barcode Text, flush-aligned)
-    font_desc = ImageFont.truetype("Helvetica", size=int(0.08 * label_height_px))
-    max_desc_line_length = 32  # Characters per line before wrapping
-    wrapped_desc_lines = [description[i:i + max_desc_line_length] for i in range(0, len(description), max_desc_line_length)]
-    desc_x = barcode_x if barcode_file else qr_x
-    desc_y = label_height_px * 0.625
-    for i, line in enumerate(wrapped_desc_lines):
-        draw.text((desc_x, desc_y + i * (font_desc.size + 2)), line, fill="black", font=font_desc)
+    return label
 
-    # Save to temp file
-    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as temp_file:
-        temp_path = temp_file.name
-        label.save(temp_path, dpi=(dpi, dpi))
 
-    # Cleanup temp QR and barcode files
-    os.remove(qr_file)
-    if barcode_file:
-        os.remove(barcode_file)
+def create_1x2_product_label(
+    qr_data,
+    barcode_data=None,
+    description="",
+    bin_location="",
+    product_code="",
+    title=""
+):
+    """Create a 1x2 product label and save it to a temporary file."""
+    return save_label(render_1x2_product_label(
+        qr_data, barcode_data, description, bin_location, product_code, title
+    ))
+
 
-    return temp_path
+def create_1x3_product_label(
+    qr_data,
+    barcode_data=None,
+    description="",
+    bin_location="",
+    product_code="",
+    title=""
+):
+    """Create a 1x3 product label and save it to a temporary file."""
+    return save_label(render_1x3_product_label(
+        qr_data, barcode_data, description, bin_location, product_code, title
+    ))
 
 
 def create_2x4_shelf_label(bin_location, title):
     """Generate a 2x4 shelf label with the Bin #: QR code and save it to a temporary file."""
-    dpi = 203
-    label_width_px = int(4 * dpi)  # 4 inches wide
-    label_height_px = int(2 * dpi)  # 2 inches tall
-
-    # Generate QR Code for Bin #
-    qr_file, _ = generate_codes(bin_location, None)  # Only QR code is generated, no barcode
-
-    # Create label template
-    label = Image.new("RGB", (label_width_px, label_height_px), "white")
-    draw = ImageDraw.Draw(label)
-
-    # Add Title (Top Center)
-    font_title = ImageFont.truetype("Helvetica", size=int(0.1 * label_height_px))
-    title_x = (label_width_px - draw.textlength(title, font=font_title)) / 2
-    draw.text((title_x, int(label_height_px * 0.03)), title, fill="black", font=font_title)
-
-    # Add QR Code
-    qr_img = Image.open(qr_file)
-    qr_width = int(label_height_px * 0.65)  # QR code size
-    qr_img = qr_img.resize((qr_width, qr_width))
-    qr_x = int(label_width_px - qr_width - (label_width_px * 0.05))  # Align to right side
-    qr_y = int(label_height_px * 0.25)  # Adjust vertical position
-    label.paste(qr_img, (qr_x, qr_y))
-
-    # Add Bin Label Text ("Bin #:")
-    font_bin_label = ImageFont.truetype("Helvetica", size=int(0.16 * label_height_px))
-    bin_label_x = int(label_width_px * 0.05)  # Align to left margin
-    bin_label_y = int(label_height_px * 0.15)  # Adjusted for spacing
-
-    # Add Bin Location Value (wrapped if necessary)
-    font_bin_value = ImageFont.truetype("Helvetica", size=int(0.3 * label_height_px))
-    max_chars_per_line = 5  # Characters before wrapping
-    wrapped_lines = [bin_location[i:i + max_chars_per_line] for i in range(0, len(bin_location), max_chars_per_line)]
-    bin_value_y = bin_label_y + font_bin_label.size + 5
-    line_height = font_bin_value.size + 2
-    for i, line in enumerate(wrapped_lines):
-        draw.text((bin_label_x, bin_value_y + i * line_height), line, fill="black", font=font_bin_value)
-
-    # Save to temp file
-    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as temp_file:
-        temp_path = temp_file.name
-        label.save(temp_path, dpi=(dpi, dpi))
-
-    # Cleanup QR temp file
-    os.remove(qr_file)
-
-    return temp_path
+    return save_label(render_2x4_shelf_label(bin_location, title))
 
 
 # label_file = create_1x3_product_label(
@@ -0,0 +1,137 @@
+import barcode
+import qrcode
+from label_generator import DPI, QR_BORDER, get_layout, wrap_text
+
+
+def field_data(text):
+    """Escape text for a ^FH^FD field so ^, ~ and _ can't break the ZPL stream."""
+    text = str(text)
+    return text.replace("_", "_5F").replace("^", "_5E").replace("~", "_7E")
+
+
+def text_field(x, y, text, font_size, block_width=None, justify="L"):
+    """Build a scalable-font (^A0) text field, optionally inside a ^FB block."""
+    block = f"^FB{int(block_width)},1,0,{justify},0" if block_width else ""
+    return f"^FO{int(x)},{int(y)}^A0N,{font_size},{font_size}{block}^FH^FD{field_data(text)}^FS"
+
+
+def qr_modules(data):
+    """Side length in modules of the smallest level H QR code holding data."""
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_H, border=0)
+    qr.add_data(data)
+    return qr.best_fit() * 4 + 17
+
+
+def code128_modules(data):
+    """Width in modules of the Code128 symbol for data."""
+    return len(barcode.get_barcode_class('code128')(data).build()[0])
+
+
+def qr_field(x, y, size, data):
+    """Build a native ^BQN QR field scaled to fit a size x size slot."""
+    modules = qr_modules(data)
+    magnification = max(1, min(10, size // (modules + 2 * QR_BORDER)))
+    offset = QR_BORDER * magnification
+    return f"^FO{x + offset},{y + offset}^BQN,2,{magnification}^FH^FDHA,{field_data(data)}^FS"
+
+
+def code128_field(x, y, width, height, data):
+    """Build a native ^BCN Code128 field with the widest module that fits the slot."""
+    modules = code128_modules(data)
+    module_width = max(1, min(10, width // modules))
+    x += (width - modules * module_width) // 2  # Center within the slot
+    return f"^BY{module_width},3,{height}^FO{x},{y}^BCN,{height},N,N,N,A^FH^FD{field_data(data)}^FS"
+
+
+def label_header(layout):
+    """Start a label sized to the layout, with UTF-8 field data."""
+    label_width_px, label_height_px = layout["label_size"]
+    return [f"^XA^PW{label_width_px}^LL{label_height_px}^CI28"]
+
+
+def title_field(layout, title):
+    """Center the title across the label like the rasterized background."""
+    return text_field(0, layout["title_y"], title, layout["font_title"].size,
+                      block_width=layout["label_size"][0], justify="C")
+
+
+def native_product_label(layout, qr_data, barcode_data, description, bin_location, product_code, title):
+    """Build native ZPL for a product label from its layout geometry."""
+    fields = label_header(layout)
+    fields.append(title_field(layout, title))
+
+    # QR Code
+    qr_x, qr_y = layout["qr_pos"]
+    fields.append(qr_field(qr_x, qr_y, layout["qr_size"], qr_data))
+
+    # Bin Location (below QR code)
+    font_bin = layout["font_bin"]
+    bin_x, bin_y = layout["bin_pos"]
+    for i, line in enumerate(wrap_text(bin_location, layout["max_bin_line_length"])):
+        fields.append(text_field(bin_x, bin_y + i * (font_bin.size + 2), line, font_bin.size))
+
+    # Barcode and its centered text
+    barcode_x, barcode_y = layout["barcode_pos"]
+    if barcode_data:
+        barcode_width, barcode_height = layout["barcode_size"]
+        fields.append(code128_field(barcode_x, barcode_y, barcode_width, barcode_height, barcode_data))
+        fields.append(text_field(barcode_x, layout["barcode_text_y"], product_code,
+                                 layout["font_barcode_text"].size, block_width=barcode_width, justify="C"))
+
+    # Description (flush-aligned below the barcode text)
+    font_desc = layout["font_desc"]
+    desc_x = barcode_x if barcode_data else qr_x
+    desc_y = layout["desc_y"]
+    for i, line in enumerate(wrap_text(description, layout["max_desc_line_length"])):
+        fields.append(text_field(desc_x, desc_y + i * (font_desc.size + 2), line, font_desc.size))
+
+    fields.append("^XZ")
+    return "\n".join(fields) + "\n"
+
+
+def native_1x2_product_label(
+    qr_data,
+    barcode_data=None,
+    description="",
+    bin_location="",
+    product_code="",
+    title="",
+    dpi=DPI
+):
+    """Build a 1x2 product label as native ZPL."""
+    layout = get_layout("1x2", title, dpi)
+    return native_product_label(layout, qr_data, barcode_data, description, bin_location, product_code, title)
+
+
+def native_1x3_product_label(
+    qr_data,
+    barcode_data=None,
+    description="",
+    bin_location="",
+    product_code="",
+    title="",
+    dpi=DPI
+):
+    """Build a 1x3 product label as native ZPL."""
+    layout = get_layout("1x3", title, dpi)
+    return native_product_label(layout, qr_data, barcode_data, description, bin_location, product_code, title)
+
+
+def native_2x4_shelf_label(bin_location, title, dpi=DPI):
+    """Build a 2x4 shelf label as native ZPL."""
+    layout = get_layout("2x4", title, dpi)
+    fields = label_header(layout)
+    fields.append(title_field(layout, title))
+
+    # QR Code
+    qr_x, qr_y = layout["qr_pos"]
+    fields.append(qr_field(qr_x, qr_y, layout["qr_size"], bin_location))
+
+    # Bin Location Value (wrapped if necessary)
+    bin_value_x, bin_value_y = layout["bin_value_pos"]
+    font_size = layout["font_bin_value"].size
+    for i, line in enumerate(wrap_text(bin_location, layout["max_chars_per_line"])):
+        fields.append(text_field(bin_value_x, bin_value_y + i * layout["line_height"], line, font_size))
+
+    fields.append("^XZ")
+    return "\n".join(fields) + "\n"
@@ -0,0 +1,123 @@
+import time
+from functools import partial
+from label_generator import DPI, get_layout, render_1x2_product_label, render_1x3_product_label, render_2x4_shelf_label
+from printer_manager import send_zpl
+from native_labels import native_1x2_product_label, native_1x3_product_label, native_2x4_shelf_label
+from stored_formats import stored_1x2_product_label, stored_1x3_product_label, stored_2x4_shelf_label, forget_printer
+from zpl import image_to_zpl, share_graphics
+from zpl_cache import cache_key, get_cached_zpl, put_cached_zpl
+from telemetry import record, timed
+
+
+# Label builders per label type and render backend. Raster builders return a PIL
+# image, the others return ZPL. Stored builders also take the printer name first.
+LABEL_RENDERERS = {
+    "1x2": {
+        "raster": render_1x2_product_label,
+        "native": native_1x2_product_label,
+        "stored": stored_1x2_product_label,
+    },
+    "1x3": {
+        "raster": render_1x3_product_label,
+        "native": native_1x3_product_label,
+        "stored": stored_1x3_product_label,
+    },
+    "2x4": {
+        "raster": render_2x4_shelf_label,
+        "native": native_2x4_shelf_label,
+        "stored": stored_2x4_shelf_label,
+    },
+}
+
+
+# Send ZPL Content via CUPS or raw TCP to Print
+def send_zpl_to_printer(zpl_content, printer_name):
+    """Send ZPL content to the specified Zebra printer."""
+    with timed("submit", printer=printer_name, size=len(zpl_content)) as details:
+        try:
+            details["ok"] = send_zpl(zpl_content, printer_name)
+        except Exception as e:
+            print(f"Failed to send to printer: {e}")
+            details["ok"] = False
+    if details["ok"]:
+        print(f"ZPL sent to printer: {printer_name}")
+    return details["ok"]
+
+
+def render_label_zpl(label_type, fields, backend="raster", printer_name=None, threshold=None):
+    """Render one label to ZPL with the chosen backend, reusing the ZPL of identical reprints.
+
+    Raster labels are dithered unless a threshold (0-255 gray level) is given.
+    """
+    if backend == "stored":
+        # Output depends on which formats the printer already holds
+        return draw_label_zpl(label_type, fields, backend, printer_name, threshold)
+
+    start = time.perf_counter()
+    key = cache_key(label_type, fields, backend, threshold)
+    zpl_content = get_cached_zpl(key)
+    if zpl_content is not None:
+        record("encode", time.perf_counter() - start, size=len(zpl_content), cache_hit=True,
+               label=label_type, backend=backend)
+        return zpl_content
+
+    zpl_content = draw_label_zpl(label_type, fields, backend, printer_name, threshold)
+    put_cached_zpl(key, zpl_content)
+    return zpl_content
+
+
+def draw_label_zpl(label_type, fields, backend="raster", printer_name=None, threshold=None):
+    """Render one label to ZPL with the chosen backend, bypassing the cache."""
+    render = LABEL_RENDERERS[label_type][backend]
+    if backend == "stored":
+        render = partial(render, printer_name)
+    if backend != "raster":
+        # Native and stored labels are built as ZPL directly
+        cache_hit = False if backend == "native" else None  # Stored recalls never go through the cache
+        with timed("encode", label=label_type, backend=backend, cache_hit=cache_hit) as details:
+            zpl_content = render(**fields)
+            details["size"] = len(zpl_content)
+        return zpl_content
+
+    with timed("raster", label=label_type):
+        label = render(**fields)
+    # The title band goes out as its own field so a batch can share it (see share_graphics)
+    layout = get_layout(label_type, fields.get("title", ""), fields.get("dpi", DPI))
+    splits = (layout["static_rows"],)
+    with timed("encode", label=label_type, backend=backend, cache_hit=False) as details:
+        if threshold is None:
+            zpl_content = image_to_zpl(label, splits=splits)
+        else:
+            zpl_content = image_to_zpl(label, dither=False, threshold=threshold, splits=splits)
+        details["size"] = len(zpl_content)
+    return zpl_content
+
+
+def with_copies(zpl_content, copies):
+    """Ask the printer for extra copies with ^PQ instead of resending the label."""
+    if copies <= 1:
+        return zpl_content
+    end = zpl_content.rindex("^XZ")
+    return zpl_content[:end] + f"^PQ{copies}\n" + zpl_content[end:]
+
+
+def build_batch(items, backend="raster", printer_name=None, threshold=None):
+    """Render (label type, fields, copies) items into one ZPL job, sending repeated graphics once."""
+    labels = []
+    for label_type, fields, copies in items:
+        labels.append(with_copies(render_label_zpl(label_type, fields, backend, printer_name, threshold), copies))
+    return share_graphics(labels)
+
+
+def send_batch(zpl_content, printer_name, backend="raster"):
+    """Submit a rendered batch to the printer as a single job."""
+    sent = send_zpl_to_printer(zpl_content, printer_name)
+    if not sent and backend == "stored":
+        # A format download in this job may not have arrived; resend it next time
+        forget_printer(printer_name)
+    return sent
+
+
+def print_batch(items, printer_name, backend="raster"):
+    """Render a batch of labels and submit it to the printer as a single job."""
+    return send_batch(build_batch(items, backend, printer_name), printer_name, backend)
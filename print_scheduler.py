@@ -0,0 +1,239 @@
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import deque
+from print_worker import deliver_events, POLL_MS
+
+
+# Jobs a printer may have waiting before submit() blocks
+MAX_QUEUED = 8
+# Seconds a printer that failed a send is skipped before it's tried again
+RETRY_AFTER = 30
+
+# Printer groups, e.g. ZEBRA_PRINTER_GROUPS="dock=dock1,dock2,dock3;office=Zebra_ZD421"
+PRINTER_GROUPS_ENV = "ZEBRA_PRINTER_GROUPS"
+# How groups appear next to single printers in printer lists
+GROUP_PREFIX = "group:"
+
+
+def parse_printer_groups(spec):
+    """Parse "group=printer,printer;group=..." into {group: [printers]}."""
+    groups = {}
+    for entry in spec.split(";"):
+        if "=" not in entry:
+            continue
+        name, members = (part.strip() for part in entry.split("=", 1))
+        printers = [member.strip() for member in members.split(",") if member.strip()]
+        if name and printers:
+            groups[name] = printers
+    return groups
+
+
+printer_groups = parse_printer_groups(os.environ.get(PRINTER_GROUPS_ENV, ""))
+
+
+class PrintJob:
+    """A run of labels that must print in order on one printer."""
+
+    def __init__(self, job_id, items, key):
+        self.job_id = job_id
+        self.items = items
+        self.key = key
+        self.tried = set()
+
+
+class PrintScheduler:
+    """Spreads print jobs over a group of printers.
+
+    Each printer has its own FIFO queue and sender thread, so the group prints
+    in parallel. Jobs with the same key (a bin or PO) stick to one printer while
+    any of them are outstanding, which keeps their labels in order. submit()
+    blocks once the chosen printer has max_queued jobs waiting. When a send
+    fails, the printer is skipped for retry_after seconds and its failed and
+    waiting jobs move, in order, to the rest of the group. A job whose labels
+    can't be rendered fails on its own without taking its printer down.
+    """
+
+    def __init__(self, printers, backend="raster", max_queued=MAX_QUEUED, retry_after=RETRY_AFTER, threshold=None):
+        self.printers = list(printers)
+        self.backend = backend
+        self.threshold = threshold  # Raster binarization level, None to dither
+        self.max_queued = max_queued
+        self.retry_after = retry_after
+        self.changed = threading.Condition()
+        self.queues = {printer: deque() for printer in self.printers}
+        self.busy = {printer: False for printer in self.printers}
+        self.down_until = {printer: 0.0 for printer in self.printers}
+        self.counts = {printer: {"sent": 0, "failed": 0} for printer in self.printers}
+        self.assignments = {}  # key -> printer
+        self.key_pending = {}  # key -> outstanding jobs
+        self.outstanding = 0
+        self.failed_jobs = 0  # Jobs that couldn't be rendered or sent anywhere
+        self.closed = False
+        self.events = queue.Queue()
+        self.job_ids = itertools.count(1)
+        self.senders = [
+            threading.Thread(target=self.send_loop, args=(printer,), name=f"print-{printer}", daemon=True)
+            for printer in self.printers
+        ]
+        for sender in self.senders:
+            sender.start()
+
+    def load(self, printer):
+        """Jobs waiting on or being sent to a printer."""
+        return len(self.queues[printer]) + self.busy[printer]
+
+    def choose(self, exclude=()):
+        """Least loaded printer that is up and not excluded, or None."""
+        now = time.monotonic()
+        candidates = [p for p in self.printers if p not in exclude and self.down_until[p] <= now]
+        if not candidates:
+            return None
+        return min(candidates, key=self.load)
+
+    def route(self, job):
+        """Pick the printer for a job: its key's printer if it has one, else the least loaded."""
+        printer = self.assignments.get(job.key) if job.key is not None else None
+        if printer is None or printer in job.tried or self.down_until[printer] > time.monotonic():
+            printer = self.choose(exclude=job.tried)
+            if printer is not None and job.key is not None:
+                self.assignments[job.key] = printer
+        return printer
+
+    def submit(self, items, key=None, block=True):
+        """Queue (label type, fields, copies) items as one job; returns the job id.
+
+        Items sharing a key print in submission order. While the target printer's
+        queue is full this blocks, or raises queue.Full if block is False.
+        """
+        job = PrintJob(next(self.job_ids), items, key)
+        with self.changed:
+            while True:
+                printer = self.route(job)
+                if printer is None:
+                    raise RuntimeError("No printers available in the group.")
+                if len(self.queues[printer]) < self.max_queued:
+                    break
+                if not block:
+                    raise queue.Full(f"{printer} already has {self.max_queued} jobs waiting")
+                self.changed.wait()
+            self.enqueue(job, printer)
+        self.events.put((job.job_id, "queued", f"Queued {len(items)} label(s) for {printer}"))
+        return job.job_id
+
+    def enqueue(self, job, printer):
+        """Append a new job to a printer's queue; the caller holds self.changed."""
+        self.outstanding += 1
+        if job.key is not None:
+            self.key_pending[job.key] = self.key_pending.get(job.key, 0) + 1
+        self.queues[printer].append(job)
+        self.changed.notify_all()
+
+    def finish(self, job):
+        """Account for a job that printed or gave up; the caller holds self.changed."""
+        self.outstanding -= 1
+        if job.key is not None:
+            self.key_pending[job.key] -= 1
+            if not self.key_pending[job.key]:
+                # Nothing of this key is in flight, so its next job may go anywhere
+                del self.key_pending[job.key]
+                self.assignments.pop(job.key, None)
+        self.changed.notify_all()
+
+    def send_loop(self, printer):
+        """Send one printer's jobs in order."""
+        # Imported on the sender thread so creating a scheduler doesn't load the renderers
+        from print_jobs import build_batch, send_batch
+        while True:
+            with self.changed:
+                while not self.queues[printer] and not self.closed:
+                    self.changed.wait()
+                if not self.queues[printer]:
+                    return
+                job = self.queues[printer].popleft()
+                self.busy[printer] = True
+                self.changed.notify_all()
+
+            try:
+                # Rendered here rather than at submit so stored formats match the printer
+                zpl_content = build_batch(job.items, self.backend, printer, self.threshold)
+            except Exception as e:
+                print(f"Failed to render job {job.job_id}: {e}")
+                with self.changed:
+                    self.busy[printer] = False
+                    self.failed_jobs += 1
+                    self.finish(job)
+                self.events.put((job.job_id, "failed", f"Could not render: {e}"))
+                continue
+
+            self.events.put((job.job_id, "sending", f"Sending to {printer}"))
+            try:
+                sent = send_batch(zpl_content, printer, self.backend)
+            except Exception as e:
+                print(f"Failed to print on {printer}: {e}")
+                sent = False
+
+            with self.changed:
+                self.busy[printer] = False
+                if sent:
+                    self.counts[printer]["sent"] += 1
+                    self.finish(job)
+                else:
+                    self.counts[printer]["failed"] += 1
+                    self.fail_over(printer, job)
+            if sent:
+                self.events.put((job.job_id, "done", f"Printed on {printer}"))
+
+    def fail_over(self, printer, job):
+        """Take a failed printer out of rotation and move its jobs, in order; the caller holds self.changed."""
+        self.down_until[printer] = time.monotonic() + self.retry_after
+        job.tried.add(printer)
+        pending = [job] + list(self.queues[printer])
+        self.queues[printer].clear()
+        for moved in pending:
+            if self.assignments.get(moved.key) == printer:
+                del self.assignments[moved.key]
+            target = self.route(moved)
+            if target is None:
+                self.events.put((moved.job_id, "failed", "Could not send to any printer in the group"))
+                self.failed_jobs += 1
+                self.finish(moved)
+                continue
+            self.queues[target].append(moved)
+            self.events.put((moved.job_id, "queued", f"{printer} failed, moved to {target}"))
+        self.changed.notify_all()
+
+    def join(self, timeout=None):
+        """Wait until every submitted job has printed or failed; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.changed:
+            while self.outstanding:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.changed.wait(remaining)
+        return True
+
+    def stats(self):
+        """Sent/failed counts, queue depth and availability per printer."""
+        now = time.monotonic()
+        with self.changed:
+            return {
+                printer: dict(self.counts[printer], queued=self.load(printer), up=self.down_until[printer] <= now)
+                for printer in self.printers
+            }
+
+    def poll(self, root, callback, interval=POLL_MS):
+        """Deliver queued events to callback(job_id, state, message) on the Tk thread via root.after."""
+        deliver_events(self.events, root, callback, interval)
+
+    def shutdown(self, wait=False):
+        """Let the sender threads exit once their queues are empty."""
+        with self.changed:
+            self.closed = True
+            self.changed.notify_all()
+        if wait:
+            for sender in self.senders:
+                sender.join()
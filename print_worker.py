@@ -0,0 +1,76 @@
+import itertools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+RENDER_THREADS = 2
+POLL_MS = 50
+
+
+def deliver_events(events, root, callback, interval=POLL_MS):
+    """Drain (job_id, state, message) events into callback, then check again after interval ms."""
+    while True:
+        try:
+            job_id, state, message = events.get_nowait()
+        except queue.Empty:
+            break
+        callback(job_id, state, message)
+    root.after(interval, deliver_events, events, root, callback, interval)
+
+
+class PrintWorker:
+    """Renders and sends print jobs off the Tk main thread.
+
+    Jobs render concurrently on a thread pool while a single sender thread submits
+    them in the order they were queued, so rendering the next label overlaps with
+    sending the previous one. Stored-format jobs are built on the sender thread
+    instead: which job carries a format download depends on what the printer was
+    sent before it. Progress events are queued and delivered on the Tk thread by poll().
+    """
+
+    def __init__(self, render_threads=RENDER_THREADS):
+        self.render_pool = ThreadPoolExecutor(max_workers=render_threads, thread_name_prefix="render")
+        self.send_queue = queue.Queue()
+        self.events = queue.Queue()
+        self.job_ids = itertools.count(1)
+        self.sender = threading.Thread(target=self.send_loop, name="print-sender", daemon=True)
+        self.sender.start()
+
+    def submit(self, items, printer_name, backend="raster"):
+        """Queue (label type, fields, copies) items for rendering and printing; returns the job id."""
+        from print_jobs import build_batch  # Loaded on first use to keep GUI startup fast
+        return self.submit_job(partial(build_batch, items, backend, printer_name), printer_name, backend,
+                               f"{len(items)} label(s)")
+
+    def submit_job(self, build, printer_name, backend="raster", description="job"):
+        """Queue a job whose ZPL build() returns, e.g. an alignment pattern; returns the job id."""
+        job_id = next(self.job_ids)
+        render = build if backend == "stored" else self.render_pool.submit(build).result
+        self.send_queue.put((job_id, printer_name, backend, render))
+        self.events.put((job_id, "queued", f"Queued {description} for {printer_name}"))
+        return job_id
+
+    def send_loop(self):
+        """Send rendered jobs in submission order."""
+        while True:
+            job_id, printer_name, backend, render = self.send_queue.get()
+            from print_jobs import send_batch
+            try:
+                zpl_content = render()
+                self.events.put((job_id, "sending", f"Sending to {printer_name}"))
+                if send_batch(zpl_content, printer_name, backend):
+                    self.events.put((job_id, "done", f"Printed on {printer_name}"))
+                else:
+                    self.events.put((job_id, "failed", f"Could not send to {printer_name}"))
+            except Exception as e:
+                self.events.put((job_id, "failed", f"Failed: {e}"))
+
+    def poll(self, root, callback, interval=POLL_MS):
+        """Deliver queued events to callback(job_id, state, message) on the Tk thread via root.after."""
+        deliver_events(self.events, root, callback, interval)
+
+    def shutdown(self):
+        """Stop accepting render work; the sender thread exits with the process."""
+        self.render_pool.shutdown(wait=False)
@@ -1,14 +1,18 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import requests
-from label_generator import (create_1x2_product_label, create_2x4_shelf_label, create_1x3_product_label, generate_codes)
-import pandas as pd
+from tkinter import ttk
 import os
 import sys
-import zebra
-import subprocess
-from test import align_test_1x2, align_test_1x3, align_test_2x4
-from zebrafy import ZebrafyImage
+import atexit
+import queue
+import threading
+from print_worker import PrintWorker
+from print_scheduler import GROUP_PREFIX, PrintScheduler, printer_groups
+from printer_manager import get_queues, start_background_refresh
+from autocomplete import debounce
+from telemetry import format_stats
+
+# pandas, PIL, NumPy, qrcode and python-barcode load on the warm-up thread (see
+# warm_up) so the window appears before they are imported
 
 
 # Handle paths dynamically based on how the script is run
@@ -20,92 +24,163 @@ else:  # When running as a normal Python script
 # Full path to the data file
 data_file = os.path.join(base_path, "data.csv")
 
-# Load the CSV file
-df = pd.read_csv(data_file)
-products_ids = sorted(df['Part ID'].dropna().unique().tolist())
-manufacturer_ids = sorted(df['Part Number'].dropna().unique().tolist())
-branches = df['Store Name'].dropna().unique().tolist()
+# New exports dropped in LABEL_CATALOG_DROP_DIR replace the bundled data.csv while the app runs
+catalog_source = os.environ.get("LABEL_CATALOG_DROP_DIR") or data_file
+catalog_watcher = None
 
+# Filled in by the warm-up thread once the catalog is loaded
+catalog = None
+df = None
+products_ids = []
+manufacturer_ids = []
+branches = []
 
-def get_printers():
-    """Get a list of all printers available on the system using lpstat."""
-    try:
-        result = subprocess.run(['lpstat', '-p'], capture_output=True, text=True, check=True)
-        printers = []
-        for line in result.stdout.splitlines():
-            if line.startswith('printer'):
-                printer_name = line.split()[1]
-                printers.append(printer_name)
-        return printers
-    except subprocess.CalledProcessError as e:
-        print(f"Failed to get printers: {e}")
-        return []
+# (kind, payload) messages from the warm-up thread to the Tk thread
+startup_events = queue.Queue()
+STARTUP_STEPS = 3
 
 
-# Send ZPL Content via CUPS to Print
-def send_zpl_to_printer(zpl_content, printer_name):
-    """Send ZPL content to the specified Zebra printer."""
+def warm_up():
+    """Import the rendering stack, load the catalog and find printers off the Tk thread."""
+    errors = []
     try:
-        z = zebra.Zebra()
-        printers = z.getqueues()
-        if not printers:
-            print("No Zebra printers found.")
-            return
-        
-        if (printer_name not in printers):
-            print(f"Printer {printer_name} not found.")
+        startup_events.put(("progress", "Loading label renderer..."))
+        from label_generator import load_symbol_cache, save_symbol_cache
+        import print_jobs  # noqa: F401  PIL, NumPy, qrcode and python-barcode
+
+        # Start with last session's QR/barcode bitmaps and save them again on exit
+        load_symbol_cache()
+        atexit.register(save_symbol_cache)
+
+        startup_events.put(("progress", "Loading catalog..."))
+        from catalog import load_catalog
+        from catalog_watcher import newest_export
+        # Load the catalog columns (from the binary cache when the CSV is unchanged) and index them
+        startup_events.put(("catalog", load_catalog(newest_export(catalog_source) or data_file)))
+    except Exception as e:
+        errors.append(f"Startup failed: {e}")
+
+    # Printers are found even when the catalog can't load, so labels typed by hand still print
+    try:
+        startup_events.put(("progress", "Finding printers..."))
+        startup_events.put(("printers", get_printers()))
+    except Exception as e:
+        errors.append(f"Printer discovery failed: {e}")
+    startup_events.put(("error", "; ".join(errors)) if errors else ("done", "Ready"))
+
+
+def apply_startup_event(kind, payload):
+    """Show warm-up progress and fill the widgets as the catalog and printers arrive."""
+    global catalog, catalog_watcher
+    if kind == "catalog":
+        catalog = payload
+        refresh_catalog_lists()
+        if branches:
+            branch_combo.current(0)
+            update_bin_locations(None)
+
+        # Pick up newer exports as they land
+        from catalog_watcher import CatalogWatcher
+        catalog_watcher = CatalogWatcher(catalog, catalog_source).start()
+        catalog_watcher.poll(root, show_catalog_update)
+    elif kind == "printers":
+        printer_combo['values'] = payload
+        if payload and not printer_combo.get():
+            printer_combo.current(0)
+    elif kind == "progress":
+        startup_progress["value"] += 1
+        status_var.set(payload)
+    else:  # done or error
+        startup_progress.pack_forget()
+        status_var.set(payload)
+        if kind == "error":
+            print(payload)
+
+
+def refresh_catalog_lists():
+    """Point the combobox lists at the catalog's current values."""
+    global df, products_ids, manufacturer_ids, branches
+    df = catalog.df
+    products_ids = catalog.products_ids
+    manufacturer_ids = catalog.manufacturer_ids
+    branches = catalog.branches
+    branch_combo['values'] = branches
+    manufacturer_combo['values'] = manufacturer_ids
+
+
+def show_catalog_update(csv_path, diff):
+    """Refresh the lists after the watcher applied a newer export."""
+    refresh_catalog_lists()
+    if branch_combo.get() not in branches and branches:
+        branch_combo.current(0)
+        update_bin_locations(None)
+    status_var.set(f"Catalog updated from {os.path.basename(csv_path)}: {diff}")
+
+
+def poll_startup():
+    """Apply warm-up events on the Tk thread until the warm-up finishes."""
+    while True:
+        try:
+            kind, payload = startup_events.get_nowait()
+        except queue.Empty:
+            break
+        apply_startup_event(kind, payload)
+        if kind in ("done", "error"):
             return
-        
-        # Set the specified printer
-        z.setqueue(printer_name)
-        
-        # Send the ZPL content to the printer
-        z.output(zpl_content)
-        print(f"ZPL sent to printer: {printer_name}")
+    root.after(50, poll_startup)
+
+
+def get_printers():
+    """Get a list of all printers available on the system, cached and refreshed in the background."""
+    try:
+        printers = get_queues()
     except Exception as e:
-        print(f"Failed to send to printer: {e}")
-
-def convert_to_zpl(png_file):
-    with open(png_file, "rb") as image:
-        zpl_content = ZebrafyImage(
-            image.read(),
-            invert=True,
-        ).to_zpl()
-    return zpl_content
-    # url = "http://api.labelary.com/v1/graphics"
-    # try:
-    #     with open(png_file, 'rb') as file:
-    #         files = {'file': file}
-    #         response = requests.post(url, files=files)
-
-    #     if response.status_code == 200:
-    #         zpl_content = response.text
-    #         print(f"ZPL Content:\n{zpl_content}")  # Print the ZPL content for debugging
-    #         return zpl_content
-    #     else:
-    #         print("Error:", response.status_code, response.text)
-    # except Exception as e:
-    #     print(f"An error occurred: {e}")
-    # return None
-    
+        print(f"Failed to get printers: {e}")
+        printers = []
+    start_background_refresh()
+    # Printer groups spread labels over several printers
+    return printers + [GROUP_PREFIX + name for name in printer_groups]
+
+
+# One scheduler per (printer group, backend), created on first use
+group_schedulers = {}
+
+def get_group_scheduler(group, backend):
+    """Return the scheduler for a printer group, starting it on first use."""
+    scheduler = group_schedulers.get((group, backend))
+    if scheduler is None:
+        scheduler = PrintScheduler(printer_groups[group], backend)
+        scheduler.poll(root, show_print_status)
+        group_schedulers[(group, backend)] = scheduler
+    return scheduler
+
 
 def align():
-    """Align the printer based on the selected label type."""
+    """Calibrate the media and print an alignment pattern for the selected label type."""
+    from functools import partial
+    from calibration import LABEL_SIZES, alignment_job
     selected_label = label_var.get()
     selected_printer = printer_combo.get()
-    if selected_label == "1x2":
-        align_test_1x2(selected_printer)
-    elif selected_label == "1x3":
-        align_test_1x3(selected_printer)
-    elif selected_label == "2x4":
-        align_test_2x4(selected_printer)
-    else:
+    if selected_label not in LABEL_SIZES:
         print("No label type selected.")
+        return
+    if not selected_printer:
+        print("No printer selected.")
+        return
+
+    # Every printer in a group is loaded with the same stock, so align them all
+    if selected_printer.startswith(GROUP_PREFIX):
+        printers = printer_groups[selected_printer[len(GROUP_PREFIX):]]
+    else:
+        printers = [selected_printer]
+    for printer_name in printers:
+        print_worker.submit_job(partial(alignment_job, selected_label), printer_name, "native",
+                                f"{selected_label} alignment")
 
 def generate_labels():
     """Generate labels dynamically with a button click."""
     # Get user input
-    po_number = po_entry.get()  # Unused for now
+    po_number = po_entry.get()  # Keeps a PO's labels in order on one printer of a group
     product_number = product_combo.get()
     manufacturer_number = manufacturer_combo.get()
     bin_location = bin_combo.get()
@@ -113,72 +188,74 @@ def generate_labels():
     manufacturer = provider_entry.get()
     num_copies = int(copies_combo.get())  # Get the number of copies
 
-    label_file = None  # Initialize to handle cleanup properly
-    zpl_content = None
+    # Raster renders with PIL, native builds ZPL fields for the printer to draw and
+    # stored recalls a format kept on the printer with only the field values
+    backend = backend_var.get()
+    selected_printer = printer_combo.get()
 
-    try:
-        # Determine selected label type
-        selected_label = label_var.get()
-        if selected_label == "1x2":
-            label_file = create_1x2_product_label(
-                qr_data=manufacturer_number,
-                barcode_data=product_number,
-                description=description,
-                bin_location=manufacturer_number,
-                product_code=product_number,
-                title=manufacturer
-            )
-        elif selected_label == "1x3":
-            label_file = create_1x3_product_label(
-                qr_data=manufacturer_number,
-                barcode_data=product_number,
-                description=description,
-                bin_location=manufacturer_number,
-                product_code=product_number,
-                title=manufacturer
-            )
-        elif selected_label == "2x4":
-            label_file = create_2x4_shelf_label(
-                bin_location=bin_location,
-                title="EquipmentShare"
-            )
-        else:
-            print("No label type selected.")
-            return
+    # Determine selected label type
+    selected_label = label_var.get()
+    if selected_label in ("1x2", "1x3"):
+        fields = {
+            "qr_data": manufacturer_number,
+            "barcode_data": product_number,
+            "description": description,
+            "bin_location": manufacturer_number,
+            "product_code": product_number,
+            "title": manufacturer,
+        }
+    elif selected_label == "2x4":
+        fields = {
+            "bin_location": bin_location,
+            "title": "EquipmentShare",
+        }
+    else:
+        print("No label type selected.")
+        return
+
+    # Render and send in the background, every copy in a single job using ^PQ
+    items = [(selected_label, fields, num_copies)]
+    if selected_printer.startswith(GROUP_PREFIX):
+        scheduler = get_group_scheduler(selected_printer[len(GROUP_PREFIX):], backend)
+        try:
+            scheduler.submit(items, key=po_number or bin_location or None, block=False)
+        except Exception as e:  # Group is full or every printer in it is down
+            status_var.set(f"Not queued: {e}")
+    elif selected_printer:
+        print_worker.submit(items, selected_printer, backend)
+    else:
+        print("No printer selected.")
 
-        print(f"Label saved to temporary file: {label_file}")
+def show_timings():
+    """Show p50/p95 timings per pipeline stage for this session."""
+    timings_window = tk.Toplevel(root)
+    timings_window.title("Stage Timings")
+    text = tk.Text(timings_window, width=60, height=12, font=("Courier", 11))
+    text.pack(fill="both", expand=True, padx=10, pady=10)
 
-        # Convert the generated file to ZPL
-        zpl_content = convert_to_zpl(label_file)
+    def refresh():
+        text.delete("1.0", tk.END)
+        text.insert("1.0", format_stats())
 
-        # Send the ZPL to the selected printer
-        selected_printer = printer_combo.get()
-        if selected_printer and zpl_content:
-            for _ in range(num_copies):
-                send_zpl_to_printer(zpl_content, selected_printer)
-            print(zpl_content)
-            print(selected_printer)
-        else:
-            print("No printer selected or ZPL content is empty.")
-    finally:
-        # Cleanup temporary files
-        try:
-            if label_file and os.path.exists(label_file):
-                os.remove(label_file)
-            print("Temporary files cleaned up.")
-        except Exception as e:
-            print(f"Error during cleanup: {e}")
+    tk.Button(timings_window, text="Refresh", command=refresh, font=LARGE_FONT).pack(pady=5)
+    refresh()
+
+def show_print_status(job_id, state, message):
+    """Show background print job progress under the Generate button."""
+    status_var.set(f"Job {job_id}: {message}")
+    print(f"Job {job_id} {state}: {message}")
 
 def filter_autocomplete(event):
     """Filter the dropdown options and keep the dropdown open."""
     typed_text = manufacturer_combo.get()  # Get the current input
+    if catalog is None:
+        return  # Still loading
     if typed_text == "":
         # Show all options if the input is empty
         manufacturer_combo['values'] = manufacturer_ids
     else:
-        # Filter options that start with the typed text
-        filtered = [item for item in manufacturer_ids if str(item).lower().startswith(typed_text.lower())]
-        manufacturer_combo['values'] = filtered
+        # Options that start with the typed text, or contain it if none do
+        manufacturer_combo['values'] = catalog.manufacturer_index.search(typed_text)
 
     # Update the dropdown menu
     manufacturer_combo.update_idletasks()
@@ -186,10 +263,14 @@ def filter_autocomplete(event):
 def populate_fields():
     """Populate Product Number, Description, and Provider based on Manufacturer Number."""
     selected_manufacturer = manufacturer_combo.get()
+    if catalog is None:
+        status_var.set("Catalog is still loading...")
+        return
+    import pandas as pd  # Already loaded with the catalog
     if selected_manufacturer:
         try:
-            # Filter the dataframe for the selected manufacturer
-            manufacturer_data = df[df['Part Number'] == selected_manufacturer]
+            # Look up the rows for the selected manufacturer
+            manufacturer_data = catalog.parts_for_number(selected_manufacturer)
 
             if not manufacturer_data.empty:
                 # Extract Product Number, Description, and Provider
@@ -258,33 +339,29 @@ def filter_bin_locations(event):
     typed_text = bin_combo.get()  # Get the current input
     selected_branch = branch_combo.get()
 
-    if selected_branch:
-        # Filter bins for the selected branch
-        branch_bins = df[df['Store Name'] == selected_branch]['Bin Location'].dropna().unique().tolist()
-    else:
-        branch_bins = []  # Default to an empty list if no branch is selected
-
-    if typed_text == "":
+    if catalog is None:
+        return  # Still loading
+    if not selected_branch:
+        bin_combo['values'] = []  # Default to an empty list if no branch is selected
+    elif typed_text == "":
         # Show all bins if input is empty
-        bin_combo['values'] = branch_bins
+        bin_combo['values'] = catalog.bins_for_store(selected_branch)
     else:
         # Filter options based on typed text
-        filtered_bins = [bin for bin in branch_bins if bin.lower().startswith(typed_text.lower())]
-        bin_combo['values'] = filtered_bins
+        bin_combo['values'] = catalog.bin_index(selected_branch).search(typed_text)
 
 def update_bin_locations(event):
     """Update Bin Location dropdown based on selected Branch Location."""
     selected_branch = branch_combo.get()
+    if catalog is None:
+        return  # Still loading
     if (selected_branch):
-        # Filter the dataframe for the selected branch
-        branch_data = df[df['Store Name'] == selected_branch]
-
-        if not branch_data.empty:
-            # Get unique bin locations for the branch
-            bin_locations = branch_data['Bin Location'].dropna().unique().tolist()
-            bin_combo['values'] = sorted(bin_locations)  # Update dropdown
-            if bin_locations:
-                bin_combo.set(bin_locations[0])  # Set the first value as default
+        # Precomputed, sorted bin locations for the branch
+        bin_locations = catalog.bins_for_store(selected_branch)
+
+        if bin_locations:
+            bin_combo['values'] = bin_locations  # Update dropdown
+            bin_combo.set(bin_locations[0])  # Set the first value as default
         else:
             bin_combo['values'] = []  # Clear dropdown if no bins found
             bin_combo.set("")  # Clear the current selection
@@ -333,21 +410,20 @@ branch_label = tk.Label(left_frame, text="Select Branch:", font=LARGE_FONT)
 branch_label.pack(pady=10, anchor="w")
 branch_combo = ttk.Combobox(left_frame, values=branches, state="readonly", width=30, font=LARGE_FONT)
 branch_combo.pack(pady=10, ipady=5)
-branch_combo.current(0)
 branch_combo.bind("<<ComboboxSelected>>", update_bin_locations)
 
 manufacturer_label = tk.Label(left_frame, text="Manufacturer Number:", font=LARGE_FONT)
 manufacturer_label.pack(pady=10, anchor="w")
 manufacturer_combo = ttk.Combobox(left_frame, values=manufacturer_ids, state="normal", width=30, font=LARGE_FONT)
 manufacturer_combo.pack(pady=10, ipady=5)
-manufacturer_combo.bind("<KeyRelease>", filter_autocomplete)
+manufacturer_combo.bind("<KeyRelease>", debounce(manufacturer_combo, filter_autocomplete))
 
 bin_label = tk.Label(left_frame, text="Bin Location:", font=LARGE_FONT)
 bin_label.pack(pady=10, anchor="w")
 bin_combo = ttk.Combobox(left_frame, state="normal", width=30, font=LARGE_FONT)
 bin_combo.pack(pady=10, ipady=5)
 bin_combo.set("")
-bin_combo.bind("<KeyRelease>", filter_bin_locations)
+bin_combo.bind("<KeyRelease>", debounce(bin_combo, filter_bin_locations))
 
 po_label = tk.Label(left_frame, text="PO Number:", font=LARGE_FONT)
 po_label.pack(pady=10, anchor="w")
@@ -360,6 +436,9 @@ populate_button.pack(pady=10)
 align_button = tk.Button(left_frame, text="Align Printer", command=lambda: align(), font=LARGE_FONT)
 align_button.pack(pady=10)
 
+timings_button = tk.Button(left_frame, text="Show Timings", command=show_timings, font=LARGE_FONT)
+timings_button.pack(pady=10)
+
 # Right Frame Content
 provider_label = tk.Label(right_frame, text="Provider:", font=LARGE_FONT)
 provider_label.pack(pady=10, anchor="w")
@@ -377,11 +456,9 @@ description_entry = tk.Entry(right_frame, width=50, font=LARGE_FONT)
 description_entry.pack(pady=10, ipady=5)
 
 tk.Label(third_frame, text="Select Printer:", font=LARGE_FONT).pack(pady=10, anchor="w")
-printers = get_printers()
-printer_combo = ttk.Combobox(third_frame, values=printers, state="readonly", width=40, font=LARGE_FONT)  # Increased width
+# Filled in by the warm-up thread; lpstat can take a while
+printer_combo = ttk.Combobox(third_frame, values=[], state="readonly", width=40, font=LARGE_FONT)  # Increased width
 printer_combo.pack(pady=10, ipady=5)
-if printers:
-    printer_combo.current(0)
 
 label_var = tk.StringVar(value="None")
 tk.Label(third_frame, text="Select Label Type:", font=LARGE_FONT).pack(anchor="w")
@@ -389,6 +466,12 @@ tk.Radiobutton(third_frame, text="Product Label 1x2", variable=label_var, value=
 tk.Radiobutton(third_frame, text="Product Label 1x3", variable=label_var, value="1x3", font=LARGE_FONT).pack(anchor="w", padx=20)
 tk.Radiobutton(third_frame, text="Shelf Label 2x4", variable=label_var, value="2x4", font=LARGE_FONT).pack(anchor="w", padx=20)
 
+backend_var = tk.StringVar(value="raster")
+tk.Label(third_frame, text="Render Mode:", font=LARGE_FONT).pack(anchor="w")
+tk.Radiobutton(third_frame, text="Image (rendered on this computer)", variable=backend_var, value="raster", font=LARGE_FONT).pack(anchor="w", padx=20)
+tk.Radiobutton(third_frame, text="Native ZPL (printer draws codes and text)", variable=backend_var, value="native", font=LARGE_FONT).pack(anchor="w", padx=20)
+tk.Radiobutton(third_frame, text="Stored format (send field values only)", variable=backend_var, value="stored", font=LARGE_FONT).pack(anchor="w", padx=20)
+
 # Add a label for the number of copies
 copies_label = tk.Label(third_frame, text="Number of Copies:", font=LARGE_FONT)
 copies_label.pack(anchor="w", padx=10, pady=10)
@@ -399,5 +482,17 @@ copies_combo.current(0)
 generate_button = tk.Button(third_frame, text="Generate and Print Label", command=generate_labels, font=LARGE_FONT)
 generate_button.pack(pady=20)
 
+# Print jobs render and send on background threads; progress comes back through root.after
+status_var = tk.StringVar(value="")
+tk.Label(third_frame, textvariable=status_var, font=LARGE_FONT).pack(anchor="w", padx=10)
+print_worker = PrintWorker()
+print_worker.poll(root, show_print_status)
+
+# Show the window now and load everything else in the background
+startup_progress = ttk.Progressbar(third_frame, maximum=STARTUP_STEPS, length=200, mode="determinate")
+startup_progress.pack(anchor="w", padx=10, pady=5)
+threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+poll_startup()
+
 root.mainloop()
 
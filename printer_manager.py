@@ -0,0 +1,227 @@
+import os
+import select
+import socket
+import subprocess
+import threading
+import time
+import zebra
+
+
+# How long a CUPS queue listing stays fresh, in seconds
+QUEUE_TTL = 60
+RAW_PORT = 9100
+CONNECT_TIMEOUT = 5
+# Seconds a connected printer may stall reading a job before the send fails
+SEND_TIMEOUT = 120
+# Seconds lpr gets to spool a job
+LPR_TIMEOUT = 30
+
+# Network Zebras driven over raw TCP, e.g. ZEBRA_NETWORK_PRINTERS="dock1=10.0.0.21,dock2=10.0.0.22:9100"
+NETWORK_PRINTERS_ENV = "ZEBRA_NETWORK_PRINTERS"
+
+
+class NetworkPrinter:
+    """A raw TCP (port 9100) connection to a network Zebra, kept open between sends."""
+
+    def __init__(self, host, port=RAW_PORT):
+        self.host = host
+        self.port = port
+        self.sock = None
+        self.lock = threading.Lock()
+
+    def connect(self):
+        """Open the socket with TCP keep-alive so idle connections survive between labels."""
+        sock = socket.create_connection((self.host, self.port), timeout=CONNECT_TIMEOUT)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # A printer busy printing reads slowly; the short connect timeout would cut jobs off midway
+        sock.settimeout(SEND_TIMEOUT)
+        self.sock = sock
+
+    def peer_closed(self):
+        """Whether the printer has closed the kept-alive connection (it drops idle sockets).
+
+        Writing to such a socket still succeeds locally and the job is lost, so
+        this is checked before every reuse: a readable socket with nothing to read is at EOF.
+        """
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+            return bool(readable) and self.sock.recv(1, socket.MSG_PEEK) == b""
+        except OSError:
+            return True
+
+    def close(self):
+        """Close the socket if it's open."""
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+    def output(self, data):
+        """Send raw bytes, reconnecting once if the kept-alive connection has dropped.
+
+        The job is only resent when none of it was written; resending a partly
+        printed job would print its labels twice.
+        """
+        data = memoryview(data)
+        with self.lock:
+            if self.sock is not None and self.peer_closed():
+                self.close()
+            for attempt in range(2):
+                sent = 0
+                try:
+                    if self.sock is None:
+                        self.connect()
+                    while sent < len(data):
+                        sent += self.sock.send(data[sent:])
+                    return
+                except OSError:
+                    self.close()
+                    if attempt or sent:
+                        raise
+
+
+class CupsPrinter:
+    """A CUPS queue fed raw ZPL through lpr.
+
+    Used instead of zebra.Zebra on Unix because zebra never checks lpr's exit
+    status, so a rejected job would look sent.
+    """
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def output(self, data):
+        """Spool raw bytes as one job, raising OSError if lpr fails."""
+        try:
+            result = subprocess.run(["lpr", f"-P{self.queue}", "-oraw"], input=data,
+                                    capture_output=True, timeout=LPR_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            raise OSError(f"lpr did not finish within {LPR_TIMEOUT}s") from None
+        if result.returncode:
+            message = result.stderr.decode("utf-8", errors="replace").strip()
+            raise OSError(f"lpr exited with status {result.returncode}: {message}")
+
+
+# Cached CUPS queue discovery and reusable per-printer handles
+queue_cache = {"queues": [], "updated": 0.0}
+queue_lock = threading.Lock()
+printer_handles = {}
+network_printers = {}
+refresh_thread = None
+
+
+def parse_network_printers(spec):
+    """Parse "name=host[:port],..." into {name: (host, port)}."""
+    printers = {}
+    for entry in spec.split(","):
+        if "=" not in entry:
+            continue
+        name, address = (part.strip() for part in entry.split("=", 1))
+        host, _, port = address.partition(":")
+        printers[name] = (host, int(port) if port else RAW_PORT)
+    return printers
+
+
+def add_network_printer(name, host, port=RAW_PORT):
+    """Register a network Zebra reachable on raw TCP under a display name."""
+    existing = network_printers.get(name)
+    if existing is not None:
+        existing.close()
+    network_printers[name] = NetworkPrinter(host, port)
+
+
+def load_network_printers(spec=None):
+    """Register network printers from a spec string, by default ZEBRA_NETWORK_PRINTERS."""
+    if spec is None:
+        spec = os.environ.get(NETWORK_PRINTERS_ENV, "")
+    for name, (host, port) in parse_network_printers(spec).items():
+        add_network_printer(name, host, port)
+
+
+load_network_printers()
+
+
+def refresh_queues():
+    """Run CUPS queue discovery (lpstat) and store the result."""
+    try:
+        queues = zebra.Zebra().getqueues()
+    except OSError as e:  # No CUPS on this host (lpstat missing)
+        print(f"Failed to get printers: {e}")
+        queues = []
+    with queue_lock:
+        queue_cache["queues"] = queues
+        queue_cache["updated"] = time.monotonic()
+    return queues
+
+
+def get_queues(max_age=QUEUE_TTL):
+    """Return CUPS queues plus network printers, rediscovering only when the cache is stale."""
+    with queue_lock:
+        queues = queue_cache["queues"]
+        fresh = queue_cache["updated"] and time.monotonic() - queue_cache["updated"] < max_age
+    if not fresh:
+        queues = refresh_queues()
+    return queues + [name for name in network_printers if name not in queues]
+
+
+def start_background_refresh(interval=QUEUE_TTL):
+    """Keep the queue cache warm from a daemon thread so sends never wait on lpstat."""
+    global refresh_thread
+    if refresh_thread is not None and refresh_thread.is_alive():
+        return
+
+    def refresh_loop():
+        while True:
+            try:
+                refresh_queues()
+            except Exception as e:
+                print(f"Failed to refresh printers: {e}")
+            time.sleep(interval)
+
+    refresh_thread = threading.Thread(target=refresh_loop, name="printer-refresh", daemon=True)
+    refresh_thread.start()
+
+
+def get_handle(printer_name):
+    """Return a reusable handle for a printer: a NetworkPrinter, a CupsPrinter, or zebra.Zebra on Windows."""
+    if printer_name in network_printers:
+        return network_printers[printer_name]
+    handle = printer_handles.get(printer_name)
+    if handle is None:
+        handle = zebra.Zebra(printer_name) if os.name == "nt" else CupsPrinter(printer_name)
+        printer_handles[printer_name] = handle
+    return handle
+
+
+def send_zpl(zpl_content, printer_name):
+    """Send ZPL through the printer's pooled handle, returning True on success."""
+    if printer_name not in network_printers:
+        queues = get_queues()
+        if printer_name not in queues:
+            # The printer may have been added since the last discovery
+            queues = get_queues(max_age=0)
+        if not queues:
+            print("No Zebra printers found.")
+            return False
+        if printer_name not in queues:
+            print(f"Printer {printer_name} not found.")
+            return False
+
+    # Native labels carry UTF-8 text (^CI28); raster ZPL is plain ASCII either way
+    if isinstance(zpl_content, str):
+        zpl_content = zpl_content.encode("utf-8")
+
+    try:
+        get_handle(printer_name).output(zpl_content)
+    except OSError as e:
+        print(f"Failed to send to {printer_name}: {e}")
+        return False
+    return True
+
+
+def close_all():
+    """Close every open network printer connection."""
+    for printer in network_printers.values():
+        printer.close()
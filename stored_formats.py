@@ -0,0 +1,214 @@
+import hashlib
+import threading
+from label_generator import DPI, QR_BORDER, get_layout, wrap_text
+from native_labels import (
+    code128_modules, field_data, native_1x2_product_label, native_1x3_product_label, native_2x4_shelf_label,
+    qr_modules,
+)
+
+
+# Stored formats have fixed symbol sizes, so they are sized for a design capacity:
+# a version 3 QR (35 alphanumeric characters at level H) and a Code128 of ~90 modules
+FORMAT_QR_MODULES = 3 * 4 + 17
+FORMAT_BARCODE_MODULES = 90
+
+FORMAT_NAMES = {
+    "1x2": "R:LABEL1X2.ZPL",
+    "1x3": "R:LABEL1X3.ZPL",
+    "2x4": "R:LABEL2X4.ZPL",
+}
+
+# Built formats keyed by (label type, dpi), and the format versions each printer has
+# received this session: {printer: {label_type: version}}
+format_cache = {}
+loaded_formats = {}
+format_lock = threading.Lock()
+
+
+def max_lines(layout, y, line_height):
+    """Number of wrapped text lines that fit between y and the bottom of the label."""
+    return max(1, int((layout["label_size"][1] - y) // line_height))
+
+
+def format_slots(label_type, dpi=DPI):
+    """Return the layout and the ordered ^FN slot names for a label type."""
+    layout = get_layout(label_type, "", dpi)
+    slots = ["title", "qr"]
+    if label_type == "2x4":
+        bin_y = layout["bin_value_pos"][1]
+        slots += [f"bin{i}" for i in range(max_lines(layout, bin_y, layout["line_height"]))]
+        return layout, slots
+
+    bin_y = layout["bin_pos"][1]
+    slots += [f"bin{i}" for i in range(max_lines(layout, bin_y, layout["font_bin"].size + 2))]
+    slots += ["barcode", "product_code"]
+    slots += [f"desc{i}" for i in range(max_lines(layout, layout["desc_y"], layout["font_desc"].size + 2))]
+    return layout, slots
+
+
+def slot_count(slots, prefix):
+    """Number of numbered line slots (bin0, bin1, ...) with the given prefix."""
+    return sum(1 for slot in slots if slot.rstrip("0123456789") == prefix)
+
+
+def format_text_field(number, x, y, font_size, block_width=None, justify="L"):
+    """Build a text field whose data is recalled through ^FN."""
+    block = f"^FB{int(block_width)},1,0,{justify},0" if block_width else ""
+    return f"^FO{int(x)},{int(y)}^A0N,{font_size},{font_size}{block}^FN{number}^FS"
+
+
+def build_format(label_type, dpi=DPI):
+    """Build the ^DF stored format for a label type from its layout geometry."""
+    layout, slots = format_slots(label_type, dpi)
+    number = {slot: i + 1 for i, slot in enumerate(slots)}
+    label_width_px, label_height_px = layout["label_size"]
+
+    fields = [f"^XA^DF{FORMAT_NAMES[label_type]}^FS", f"^PW{label_width_px}^LL{label_height_px}^CI28"]
+    fields.append(format_text_field(number["title"], 0, layout["title_y"], layout["font_title"].size,
+                                    block_width=label_width_px, justify="C"))
+
+    # QR Code
+    qr_x, qr_y = layout["qr_pos"]
+    magnification = max(1, min(10, layout["qr_size"] // (FORMAT_QR_MODULES + 2 * QR_BORDER)))
+    offset = QR_BORDER * magnification
+    fields.append(f"^FO{qr_x + offset},{qr_y + offset}^BQN,2,{magnification}^FN{number['qr']}^FS")
+
+    if label_type == "2x4":
+        bin_x, bin_y = layout["bin_value_pos"]
+        font_size = layout["font_bin_value"].size
+        for i in range(slot_count(slots, "bin")):
+            fields.append(format_text_field(number[f"bin{i}"], bin_x, bin_y + i * layout["line_height"], font_size))
+    else:
+        # Bin Location (below QR code)
+        font_bin = layout["font_bin"]
+        bin_x, bin_y = layout["bin_pos"]
+        for i in range(slot_count(slots, "bin")):
+            fields.append(format_text_field(number[f"bin{i}"], bin_x, bin_y + i * (font_bin.size + 2), font_bin.size))
+
+        # Barcode and its centered text
+        barcode_x, barcode_y = layout["barcode_pos"]
+        barcode_width, barcode_height = layout["barcode_size"]
+        module_width = max(1, min(10, barcode_width // FORMAT_BARCODE_MODULES))
+        fields.append(f"^BY{module_width},3,{barcode_height}^FO{barcode_x},{barcode_y}"
+                      f"^BCN,{barcode_height},N,N,N,A^FN{number['barcode']}^FS")
+        fields.append(format_text_field(number["product_code"], barcode_x, layout["barcode_text_y"],
+                                        layout["font_barcode_text"].size, block_width=barcode_width, justify="C"))
+
+        # Description (flush-aligned below the barcode text)
+        font_desc = layout["font_desc"]
+        for i in range(slot_count(slots, "desc")):
+            fields.append(format_text_field(number[f"desc{i}"], barcode_x, layout["desc_y"] + i * (font_desc.size + 2),
+                                            font_desc.size))
+
+    fields.append("^XZ")
+    return "\n".join(fields) + "\n"
+
+
+def format_version(format_zpl):
+    """Short content hash identifying a stored format revision."""
+    return hashlib.sha1(format_zpl.encode("utf-8")).hexdigest()[:12]
+
+
+def recall_label(label_type, values, dpi=DPI):
+    """Build the ^XF recall for a stored format with per-label ^FN values."""
+    layout, slots = format_slots(label_type, dpi)
+    fields = [f"^XA^XF{FORMAT_NAMES[label_type]}^CI28"]
+    for i, slot in enumerate(slots):
+        value = values.get(slot, "")
+        if slot == "qr":
+            value = f"HA,{value}"
+        fields.append(f"^FN{i + 1}^FH^FD{field_data(value)}^FS")
+    fields.append("^XZ")
+    return "\n".join(fields) + "\n"
+
+
+def stored_label_zpl(printer_name, label_type, values, dpi=DPI):
+    """Return the recall ZPL, preceded by the format download if the printer lacks this version."""
+    key = (label_type, dpi)
+    if key not in format_cache:
+        format_zpl = build_format(label_type, dpi)
+        format_cache[key] = (format_zpl, format_version(format_zpl))
+    format_zpl, version = format_cache[key]
+
+    zpl_content = recall_label(label_type, values, dpi)
+    # Exactly one job may carry the download, even when several render at once
+    with format_lock:
+        printer_formats = loaded_formats.setdefault(printer_name, {})
+        download = printer_formats.get(label_type) != version
+        printer_formats[label_type] = version
+    if download:
+        zpl_content = format_zpl + zpl_content
+    return zpl_content
+
+
+def forget_printer(printer_name):
+    """Drop what we know a printer has stored, e.g. after a failed send or power cycle."""
+    with format_lock:
+        loaded_formats.pop(printer_name, None)
+
+
+def fits_format(qr_data, barcode_data=None):
+    """Whether the symbols fit the format's fixed QR and barcode sizes; larger ones would overrun the label."""
+    if qr_modules(qr_data) > FORMAT_QR_MODULES:
+        return False
+    return barcode_data is None or code128_modules(barcode_data) <= FORMAT_BARCODE_MODULES
+
+
+def stored_product_label(printer_name, label_type, qr_data, barcode_data, description, bin_location,
+                         product_code, title, dpi=DPI):
+    """Build a product label recall, wrapping text into the format's line slots."""
+    if not barcode_data or not fits_format(qr_data, barcode_data):
+        # The stored layout always reserves the barcode slot and sizes symbols for its
+        # design capacity; build without it or with symbols scaled to the data instead
+        native = native_1x2_product_label if label_type == "1x2" else native_1x3_product_label
+        return native(qr_data, barcode_data, description, bin_location, product_code, title, dpi)
+
+    layout = get_layout(label_type, "", dpi)
+    values = {"title": title, "qr": qr_data, "barcode": barcode_data, "product_code": product_code}
+    for i, line in enumerate(wrap_text(bin_location, layout["max_bin_line_length"])):
+        values[f"bin{i}"] = line
+    for i, line in enumerate(wrap_text(description, layout["max_desc_line_length"])):
+        values[f"desc{i}"] = line
+    return stored_label_zpl(printer_name, label_type, values, dpi)
+
+
+def stored_1x2_product_label(
+    printer_name,
+    qr_data,
+    barcode_data=None,
+    description="",
+    bin_location="",
+    product_code="",
+    title="",
+    dpi=DPI
+):
+    """Build a 1x2 product label as a stored-format recall for printer_name."""
+    return stored_product_label(printer_name, "1x2", qr_data, barcode_data, description, bin_location,
+                                product_code, title, dpi)
+
+
+def stored_1x3_product_label(
+    printer_name,
+    qr_data,
+    barcode_data=None,
+    description="",
+    bin_location="",
+    product_code="",
+    title="",
+    dpi=DPI
+):
+    """Build a 1x3 product label as a stored-format recall for printer_name."""
+    return stored_product_label(printer_name, "1x3", qr_data, barcode_data, description, bin_location,
+                                product_code, title, dpi)
+
+
+def stored_2x4_shelf_label(printer_name, bin_location, title, dpi=DPI):
+    """Build a 2x4 shelf label as a stored-format recall for printer_name."""
+    if not fits_format(bin_location):
+        return native_2x4_shelf_label(bin_location, title, dpi)
+
+    layout = get_layout("2x4", "", dpi)
+    values = {"title": title, "qr": bin_location}
+    for i, line in enumerate(wrap_text(bin_location, layout["max_chars_per_line"])):
+        values[f"bin{i}"] = line
+    return stored_label_zpl(printer_name, "2x4", values, dpi)
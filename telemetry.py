@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+# Pipeline stages in the order a label goes through them. Symbol and layout run
+# inside raster, so raster timings include theirs.
+STAGES = ("lookup", "symbol", "layout", "raster", "encode", "submit")
+
+# Most recent stage events kept in memory for the stats view
+RING_SIZE = 4096
+
+# Append every event as a JSON line to this file, e.g. LABEL_TELEMETRY_LOG=~/label-timings.jsonl
+LOG_ENV = "LABEL_TELEMETRY_LOG"
+
+events = deque(maxlen=RING_SIZE)
+events_lock = threading.Lock()
+hooks = []
+
+
+def add_hook(hook):
+    """Call hook(event) for every recorded event, e.g. to ship timings elsewhere."""
+    hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook):
+    """Stop calling a hook added with add_hook."""
+    if hook in hooks:
+        hooks.remove(hook)
+
+
+def record(stage, seconds, size=None, cache_hit=None, **info):
+    """Store one stage event in the ring buffer and pass it to the hooks."""
+    event = {"stage": stage, "time": time.time(), "ms": seconds * 1000}
+    if size is not None:
+        event["bytes"] = size
+    if cache_hit is not None:
+        event["cache_hit"] = cache_hit
+    event.update(info)
+    with events_lock:
+        events.append(event)
+    for hook in list(hooks):
+        try:
+            hook(event)
+        except Exception as e:
+            print(f"Telemetry hook failed: {e}")
+    return event
+
+
+@contextmanager
+def timed(stage, **info):
+    """Time a block as a stage; the block can add size (bytes), cache_hit or other details to the yielded dict."""
+    details = dict(info)
+    start = time.perf_counter()
+    try:
+        yield details
+    finally:
+        record(stage, time.perf_counter() - start, **details)
+
+
+def json_log_hook(path):
+    """Hook that appends events to a JSON Lines file."""
+    lock = threading.Lock()
+
+    def write(event):
+        with lock, open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event, default=str) + "\n")
+
+    return write
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a sorted list."""
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def stage_stats():
+    """Per-stage count, p50/p95 in ms, average bytes and cache hit rate over the ring buffer."""
+    with events_lock:
+        snapshot = list(events)
+
+    by_stage = {}
+    for event in snapshot:
+        by_stage.setdefault(event["stage"], []).append(event)
+
+    stats = {}
+    for stage in sorted(by_stage, key=lambda name: STAGES.index(name) if name in STAGES else len(STAGES)):
+        stage_events = by_stage[stage]
+        durations = sorted(event["ms"] for event in stage_events)
+        sizes = [event["bytes"] for event in stage_events if "bytes" in event]
+        hits = [event["cache_hit"] for event in stage_events if "cache_hit" in event]
+        stats[stage] = {
+            "count": len(stage_events),
+            "p50_ms": percentile(durations, 0.5),
+            "p95_ms": percentile(durations, 0.95),
+            "avg_bytes": sum(sizes) / len(sizes) if sizes else None,
+            "hit_rate": sum(hits) / len(hits) if hits else None,
+        }
+    return stats
+
+
+def format_stats(stats=None):
+    """Render stage_stats() as a fixed-width table."""
+    if stats is None:
+        stats = stage_stats()
+    if not stats:
+        return "No timings recorded yet."
+    lines = [f"{'Stage':<8} {'Count':>6} {'p50 ms':>9} {'p95 ms':>9} {'Bytes':>8} {'Hits':>6}"]
+    for stage, row in stats.items():
+        size = f"{row['avg_bytes']:.0f}" if row["avg_bytes"] is not None else "-"
+        hit_rate = f"{row['hit_rate']:.0%}" if row["hit_rate"] is not None else "-"
+        lines.append(f"{stage:<8} {row['count']:>6} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} {size:>8} {hit_rate:>6}")
+    return "\n".join(lines)
+
+
+def clear():
+    """Drop every recorded event."""
+    with events_lock:
+        events.clear()
+
+
+if os.environ.get(LOG_ENV):
+    add_hook(json_log_hook(os.path.expanduser(os.environ[LOG_ENV])))
@@ -1,84 +1,16 @@
-import zebra
+from calibration import alignment_job
+from print_jobs import send_zpl_to_printer
 
 def align_test_1x2(printer_name):
-    zpl_content = """
-    ^XA
-    ^PW406
-    ^LL203
-    ^FO0,0^GFA,10353,10353,51,,::::gU0180C60307C01F81806I03FE0C06,gU0180C6030FF07FC180E0E03FF0E0607,gU0180C6031830E0E1C0C0E03038E0607,gU0180C6031818C070C0C0B03018F06058,gU0180C60330198030C181B03018B860D8,gU0180C60318018018E1819830189860CC,gU01FFC6031F01801861811830388C608C,gU01FFC6030FF180186303183FF08C618C,gU0180C6030079801873030C3FF0866186,gU0180C603001980303307FC30388763FE,gU0180C603301980303607FC30188363FE,gU0180C6073018C1F01E0606301881E303,gU0180C70E1838E1E01E0C06301881E603,gU0180C3FC1FF07FE01C0C07301880E6038,gU0180C0F807E01F300C1803301C80EC018,hN01,,::::::::::::::::M0MF0FF00787LF8,:::M0FK0F0F0F87878J078,M0FK0F0F0F87878J078gS01E20FE1E0C061E04600F0400CF01F84F8,M0FK0F0F0F87878J078gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:M0F0IF0F00FF878787FF878gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::M0F0IF0F0FF0780787FF878gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::::::M0FK0F0FF007878J078gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::M0MF0F0F8787LF8gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::V0JF8hG01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::P0F00F00FK07FF87F8gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::Q0F00LF80787IF8gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::O0FF00F0FI07F87FF8gV01E30FE1E0C0E1F0C601F0600CF01FCCF8,::::N0FF0F00LF807F87878gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::M0FFI0FFN07878078gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::U0FI07FF8787878gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::M0MFI0FF8I0787F8gT01E30FE1E0C0E1F0C601F0600CF01FCCF8,M0MFI0FF8I0787F8gT01E20FE1E0C061E04600F0400CF01F84F8,M0MFI0FF8I0787F8,:M0FK0FI0FF8078I07F8,:::M0F0IF0FI0F8M07F8,:::M0F0IF0F0KF87F8787F8hL0C0E1FC3C,M0F0IF0F0KF87F8787F8hL0C1100C46,M0F0IF0F0KF87F8787F8hK03C21808C2,M0F0IF0F0KF87F8787F8hL0C208188,M0F0IF0F00F07FF87878078hL0C20830BC,M0F0IF0F00F07FF87878078hL0C20830C6,M0F0IF0F00F07FF87878078hL0C2082082,M0F0IF0F00F07FF87878078hL0C2086082,M0FK0F00IF878787878hM0C2184082,M0FK0F00IF878787878hM0C31040C6,M0FK0F00IF878787878hM0C0E0C038,M0FK0F00IF878787878,M0MFI0F8007F87F8,:::,::::i02CQ0FE0FES0FE0101,hV018062C0183E1F8030C30C1007C1CM0C3018307,hV0180E2C018631I030C18C180C6223F71FB8C1018307,hV0780E2C078413I0F0C08C180824I3I9IC1008605,hV0181624018412I030C0CC180824131898C4C300C6098,hV01836I018033E0030C0CC1I06413109884FE00C6088,hV01866I01806318030C0CFEI0C412109084C1004C188,hV01846I01808018030C0CC01E10412109084C1806C1FC,hV018FFI0183I08030C08CI060412109084C18068104,hV01806I01860218030C18CI0C0432109084C18038306,hV01806I01840310030C30CI080622109084C10038206,hV01806I0187F1E0030FE0CI0FE1C2109084FE0030602,,:::::hV0FFJ0F0604FFC078L01FC2J0C,hV0C184030C6040C0086L01862J0C,hV0C08402046040C01821F318818221F0FC38,hV0C08406066040C018331318818223119C44,hV0C18404006040C00C021939818622190C86,hV0FF0404006040C00780192901FC20190C82,hV0C18404006040CI0E1F9A9018221F904FE,hV0C084F4006040CI03319AD0183231B048,hV0C08406062040C0103218A7018322190C8,hV0C084020420C0C0183218E6018322190CC6,hV0C0C4030C3080C0086338C6018223399C44,hV0C0C400F00F00C007C1IC601FC21CCF438,,::::::::::::::::::::::::::::::::::::::::::::^FS^XZ
-    """
-    try:
-        z = zebra.Zebra()
-        printers = z.getqueues()
-        if not printers:
-            print("No Zebra printers found.")
-            return
-        
-        if printer_name not in printers:
-            print(f"Printer {printer_name} not found.")
-            return
-        
-        # Set the specified printer
-        z.setqueue(printer_name)
-        
-        # Send the ZPL content to the printer
-        z.output(zpl_content)
-        print(f"ZPL sent to printer: {printer_name}")
-    except Exception as e:
-        print(f"Failed to send to printer: {e}")
+    """Calibrate the media and print the 1x2 alignment pattern."""
+    send_zpl_to_printer(alignment_job("1x2"), printer_name)
 
 
 def align_test_1x3(printer_name):
-    zpl_content = """
-    ^XA
-    ^PW609
-    ^LL203
-    ^FO0,0^GFA,10353,10353,51,,::::gU0180C60307C01F81806I03FE0C06,gU0180C6030FF07FC180E0E03FF0E0607,gU0180C6031830E0E1C0C0E03038E0607,gU0180C6031818C070C0C0B03018F06058,gU0180C60330198030C181B03018B860D8,gU0180C60318018018E1819830189860CC,gU01FFC6031F01801861811830388C608C,gU01FFC6030FF180186303183FF08C618C,gU0180C6030079801873030C3FF0866186,gU0180C603001980303307FC30388763FE,gU0180C603301980303607FC30188363FE,gU0180C6073018C1F01E0606301881E303,gU0180C70E1838E1E01E0C06301881E603,gU0180C3FC1FF07FE01C0C07301880E6038,gU0180C0F807E01F300C1803301C80EC018,hN01,,::::::::::::::::M0MF0FF00787LF8,:::M0FK0F0F0F87878J078,M0FK0F0F0F87878J078gS01E20FE1E0C061E04600F0400CF01F84F8,M0FK0F0F0F87878J078gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:M0F0IF0F00FF878787FF878gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::M0F0IF0F0FF0780787FF878gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::::::M0FK0F0FF007878J078gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::M0MF0F0F8787LF8gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::V0JF8hG01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::P0F00F00FK07FF87F8gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::Q0F00LF80787IF8gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::O0FF00F0FI07F87FF8gV01E30FE1E0C0E1F0C601F0600CF01FCCF8,::::N0FF0F00LF807F87878gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::M0FFI0FFN07878078gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::U0FI07FF8787878gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::M0MFI0FF8I0787F8gT01E30FE1E0C0E1F0C601F0600CF01FCCF8,M0MFI0FF8I0787F8gT01E20FE1E0C061E04600F0400CF01F84F8,M0MFI0FF8I0787F8,:M0FK0FI0FF8078I07F8,:::M0F0IF0FI0F8M07F8,:::M0F0IF0F0KF87F8787F8hL0C0E1FC3C,M0F0IF0F0KF87F8787F8hL0C1100C46,M0F0IF0F0KF87F8787F8hK03C21808C2,M0F0IF0F0KF87F8787F8hL0C208188,M0F0IF0F00F07FF87878078hL0C20830BC,M0F0IF0F00F07FF87878078hL0C20830C6,M0F0IF0F00F07FF87878078hL0C2082082,M0F0IF0F00F07FF87878078hL0C2086082,M0FK0F00IF878787878hM0C2184082,M0FK0F00IF878787878hM0C31040C6,M0FK0F00IF878787878hM0C0E0C038,M0FK0F00IF878787878,M0MFI0F8007F87F8,:::,::::i02CQ0FE0FES0FE0101,hV018062C0183E1F8030C30C1007C1CM0C3018307,hV0180E2C018631I030C18C180C6223F71FB8C1018307,hV0780E2C078413I0F0C08C180824I3I9IC1008605,hV0181624018412I030C0CC180824131898C4C300C6098,hV01836I018033E0030C0CC1I06413109884FE00C6088,hV01866I01806318030C0CFEI0C412109084C1004C188,hV01846I01808018030C0CC01E10412109084C1806C1FC,hV018FFI0183I08030C08CI060412109084C18068104,hV01806I01860218030C18CI0C0432109084C18038306,hV01806I01840310030C30CI080622109084C10038206,hV01806I0187F1E0030FE0CI0FE1C2109084FE0030602,,:::::hV0FFJ0F0604FFC078L01FC2J0C,hV0C184030C6040C0086L01862J0C,hV0C08402046040C01821F318818221F0FC38,hV0C08406066040C018331318818223119C44,hV0C18404006040C00C021939818622190C86,hV0FF0404006040C00780192901FC20190C82,hV0C18404006040CI0E1F9A9018221F904FE,hV0C084F4006040CI03319AD0183231B048,hV0C08406062040C0103218A7018322190C8,hV0C084020420C0C0183218E6018322190CC6,hV0C0C4030C3080C0086338C6018223399C44,hV0C0C400F00F00C007C1IC601FC21CCF438,,::::::::::::::::::::::::::::::::::::::::::::^FS^XZ
-    """
-    try:
-        z = zebra.Zebra()
-        printers = z.getqueues()
-        if not printers:
-            print("No Zebra printers found.")
-            return
-        
-        if printer_name not in printers:
-            print(f"Printer {printer_name} not found.")
-            return
-        
-        # Set the specified printer
-        z.setqueue(printer_name)
-        
-        # Send the ZPL content to the printer
-        z.output(zpl_content)
-        print(f"ZPL sent to printer: {printer_name}")
-    except Exception as e:
-        print(f"Failed to send to printer: {e}")
+    """Calibrate the media and print the 1x3 alignment pattern."""
+    send_zpl_to_printer(alignment_job("1x3"), printer_name)
 
 
 def align_test_2x4(printer_name):
-    zpl_content = """
-    ^XA
-    ^PW812
-    ^LL406
-    ^FO0,0^GFA,10353,10353,51,,::::gU0180C60307C01F81806I03FE0C06,gU0180C6030FF07FC180E0E03FF0E0607,gU0180C6031830E0E1C0C0E03038E0607,gU0180C6031818C070C0C0B03018F06058,gU0180C60330198030C181B03018B860D8,gU0180C60318018018E1819830189860CC,gU01FFC6031F01801861811830388C608C,gU01FFC6030FF180186303183FF08C618C,gU0180C6030079801873030C3FF0866186,gU0180C603001980303307FC30388763FE,gU0180C603301980303607FC30188363FE,gU0180C6073018C1F01E0606301881E303,gU0180C70E1838E1E01E0C06301881E603,gU0180C3FC1FF07FE01C0C07301880E6038,gU0180C0F807E01F300C1803301C80EC018,hN01,,::::::::::::::::M0MF0FF00787LF8,:::M0FK0F0F0F87878J078,M0FK0F0F0F87878J078gS01E20FE1E0C061E04600F0400CF01F84F8,M0FK0F0F0F87878J078gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:M0F0IF0F00FF878787FF878gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::M0F0IF0F0FF0780787FF878gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::::::M0FK0F0FF007878J078gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::M0MF0F0F8787LF8gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::V0JF8hG01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::P0F00F00FK07FF87F8gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::Q0F00LF80787IF8gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::O0FF00F0FI07F87FF8gV01E30FE1E0C0E1F0C601F0600CF01FCCF8,::::N0FF0F00LF807F87878gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::M0FFI0FFN07878078gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::U0FI07FF8787878gS01E30FE1E0C0E1F0C601F0600CF01FCCF8,:::M0MFI0FF8I0787F8gT01E30FE1E0C0E1F0C601F0600CF01FCCF8,M0MFI0FF8I0787F8gT01E20FE1E0C061E04600F0400CF01F84F8,M0MFI0FF8I0787F8,:M0FK0FI0FF8078I07F8,:::M0F0IF0FI0F8M07F8,:::M0F0IF0F0KF87F8787F8hL0C0E1FC3C,M0F0IF0F0KF87F8787F8hL0C1100C46,M0F0IF0F0KF87F8787F8hK03C21808C2,M0F0IF0F0KF87F8787F8hL0C208188,M0F0IF0F00F07FF87878078hL0C20830BC,M0F0IF0F00F07FF87878078hL0C20830C6,M0F0IF0F00F07FF87878078hL0C2082082,M0F0IF0F00F07FF87878078hL0C2086082,M0FK0F00IF878787878hM0C2184082,M0FK0F00IF878787878hM0C31040C6,M0FK0F00IF878787878hM0C0E0C038,M0FK0F00IF878787878,M0MFI0F8007F87F8,:::,::::i02CQ0FE0FES0FE0101,hV018062C0183E1F8030C30C1007C1CM0C3018307,hV0180E2C018631I030C18C180C6223F71FB8C1018307,hV0780E2C078413I0F0C08C180824I3I9IC1008605,hV0181624018412I030C0CC180824131898C4C300C6098,hV01836I018033E0030C0CC1I06413109884FE00C6088,hV01866I01806318030C0CFEI0C412109084C1004C188,hV01846I01808018030C0CC01E10412109084C1806C1FC,hV018FFI0183I08030C08CI060412109084C18068104,hV01806I01860218030C18CI0C0432109084C18038306,hV01806I01840310030C30CI080622109084C10038206,hV01806I0187F1E0030FE0CI0FE1C2109084FE0030602,,:::::hV0FFJ0F0604FFC078L01FC2J0C,hV0C184030C6040C0086L01862J0C,hV0C08402046040C01821F318818221F0FC38,hV0C08406066040C018331318818223119C44,hV0C18404006040C00C021939818622190C86,hV0FF0404006040C00780192901FC20190C82,hV0C18404006040CI0E1F9A9018221F904FE,hV0C084F4006040CI03319AD0183231B048,hV0C08406062040C0103218A7018322190C8,hV0C084020420C0C0183218E6018322190CC6,hV0C0C4030C3080C0086338C6018223399C44,hV0C0C400F00F00C007C1IC601FC21CCF438,,::::::::::::::::::::::::::::::::::::::::::::^FS^XZ
-    """
-    try:
-        z = zebra.Zebra()
-        printers = z.getqueues()
-        if not printers:
-            print("No Zebra printers found.")
-            return
-        
-        if printer_name not in printers:
-            print(f"Printer {printer_name} not found.")
-            return
-        
-        # Set the specified printer
-        z.setqueue(printer_name)
-        
-        # Send the ZPL content to the printer
-        z.output(zpl_content)
-        print(f"ZPL sent to printer: {printer_name}")
-    except Exception as e:
-        print(f"Failed to send to printer: {e}")
\ No newline at end of file
+    """Calibrate the media and print the 2x4 alignment pattern."""
+    send_zpl_to_printer(alignment_job("2x4"), printer_name)
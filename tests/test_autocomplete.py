@@ -0,0 +1,32 @@
+import random
+import string
+from autocomplete import FUZZY_WINDOW, PrefixIndex
+
+
+def random_parts(count, seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choices(string.ascii_uppercase, k=3)) + "".join(rng.choices(string.digits + "-", k=5))
+            for _ in range(count)]
+
+
+def test_substring_matches_a_linear_scan():
+    parts = random_parts(5000)
+    index = PrefixIndex(parts)
+    for text in ("12", "A1", "-0-", "Z9", "9A"):  # "9A" only occurs across a key boundary
+        expected = [value for key, value in zip(index.keys, index.values) if text.casefold() in key]
+        assert index.substring(text, limit=10_000) == expected
+
+
+def test_substring_sees_added_and_removed_values():
+    index = PrefixIndex(["ABC-1", "XYZ-2"])
+    index.add("QQQ-3")
+    index.remove("ABC-1")
+    assert index.substring("-") == ["QQQ-3", "XYZ-2"]
+
+
+def test_typos_are_matched_within_the_window():
+    parts = random_parts(10 * FUZZY_WINDOW)
+    index = PrefixIndex(parts)
+    target = parts[123]
+    typo = target[:-1] + ("X" if target[-1] != "X" else "Y")
+    assert target in index.search(typo)
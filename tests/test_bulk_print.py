@@ -0,0 +1,33 @@
+import bulk_print
+import print_jobs
+import stored_formats
+
+ROWS = [
+    {"Bin Location": f"CE{i % 3}", "Part Number": f"BCM{i}", "Part ID": f"22578{i}",
+     "Description": "RED BARRICADE TAG", "Provider": "3M"}
+    for i in range(6)
+]
+
+
+def test_failed_batches_are_counted_and_forget_stored_formats(monkeypatch):
+    results = iter([True, False])
+    monkeypatch.setattr(print_jobs, "send_zpl_to_printer", lambda zpl, printer: next(results))
+    stored_formats.loaded_formats["Zebra_ZD421"] = {"1x2": "version"}
+
+    labels = ["^XA^XZ\n"] * 4
+    assert bulk_print.write_labels(labels, "Zebra_ZD421", batch_size=2, backend="stored") == (4, 1)
+    assert "Zebra_ZD421" not in stored_formats.loaded_formats
+
+
+def test_scheduled_labels_keep_the_threshold(monkeypatch):
+    thresholds = []
+
+    def build_batch(items, backend, printer_name, threshold=None):
+        thresholds.append(threshold)
+        return "^XA^XZ\n"
+
+    monkeypatch.setattr(print_jobs, "build_batch", build_batch)
+    monkeypatch.setattr(print_jobs, "send_batch", lambda zpl, printer, backend: True)
+    count, failed = bulk_print.schedule_labels(ROWS, "1x2", ["a", "b"], threshold=140)
+    assert (count, failed) == (6, 0)
+    assert thresholds and set(thresholds) == {140}
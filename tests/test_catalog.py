@@ -0,0 +1,94 @@
+import os
+import shutil
+from catalog import (
+    CACHE_ENTRIES, Catalog, cached_catalog_frame, combine_chunks, diff_frames, keyed, load_catalog, load_catalog_frame,
+    read_catalog_chunks,
+)
+
+DATA_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data.csv")
+
+
+def load_frame():
+    return keyed(combine_chunks(list(read_catalog_chunks(DATA_CSV))))
+
+
+def sorted_index(index):
+    return {key: sorted(labels) for key, labels in index.items()}
+
+
+def test_edited_export_diffs_by_row():
+    old = load_frame()
+    new = old.drop(old.index[[1, 2]]).copy()
+    new.loc[new.index[0], "Description"] = "NEW DESC"
+
+    diff = diff_frames(old, keyed(new))
+    assert not diff.full
+    assert (len(diff.added), len(diff.removed), len(diff.changed)) == (0, 2, 1)
+
+
+def test_apply_changes_matches_fresh_build():
+    old = load_frame()
+    catalog = Catalog(old)
+    new = old.drop(old.index[[1, 2]]).copy()
+    new.loc[new.index[0], "Part Number"] = "ZZTOP-1"
+
+    diff = catalog.apply_changes(new)
+    fresh = Catalog(new)
+    assert not diff.full
+    assert sorted_index(catalog.by_part_number) == sorted_index(fresh.by_part_number)
+    assert sorted_index(catalog.by_part_id) == sorted_index(fresh.by_part_id)
+    assert catalog.manufacturer_ids == fresh.manufacturer_ids
+    assert catalog.products_ids == fresh.products_ids
+    assert catalog.value_counts == fresh.value_counts
+
+
+def test_streamed_catalog_matches_whole_frame_build():
+    streamed = Catalog.from_chunks(read_catalog_chunks(DATA_CSV, chunk_rows=500))
+    whole = Catalog(load_frame())
+    assert streamed.df.equals(whole.df)
+    for name in ("by_part_number", "by_part_id", "by_upc"):
+        assert sorted_index(getattr(streamed, name)) == sorted_index(getattr(whole, name))
+    assert streamed.products_ids == whole.products_ids
+    assert streamed.manufacturer_ids == whole.manufacturer_ids
+    assert streamed.branches == whole.branches
+
+
+def test_lookups_normalize_keys_like_the_gui():
+    catalog = Catalog(load_frame())
+    assert len(catalog.parts_for_id(2257898)) == len(catalog.parts_for_id("2257898")) > 0
+    assert catalog.parts_for_id("02257898").empty
+    assert catalog.parts_for_upc("0").empty  # UPC 0 means no UPC
+    assert catalog.lookup("BCM9465")["Part Number"].eq("BCM9465").all()
+
+
+def test_cache_hits_for_the_same_export_in_another_directory(tmp_path):
+    # A onefile build extracts data.csv to a new temporary directory on every launch
+    cache_dir = tmp_path / "cache"
+    for launch in range(3):
+        extract_dir = tmp_path / f"_MEI{launch}"
+        extract_dir.mkdir()
+        csv_path = shutil.copy(DATA_CSV, extract_dir / "data.csv")
+        df, _ = cached_catalog_frame(str(csv_path), str(cache_dir))
+        assert (df is not None) == (launch > 0)
+        load_catalog_frame(str(csv_path), str(cache_dir))
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_cache_keeps_only_recent_entries(tmp_path):
+    cache_dir = tmp_path / "cache"
+    for i in range(CACHE_ENTRIES + 2):
+        load_catalog_frame(shutil.copy(DATA_CSV, tmp_path / f"export{i}.csv"), str(cache_dir))
+    assert len([name for name in os.listdir(cache_dir) if name.endswith(".json")]) == CACHE_ENTRIES
+
+
+def test_malformed_ids_do_not_stop_the_catalog_loading(tmp_path):
+    lines = open(DATA_CSV, encoding="utf-8").read().splitlines(keepends=True)
+    lines[2] = lines[2].replace(",4028313,", ",4028313A,", 1)
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("".join(lines), encoding="utf-8")
+
+    catalog = load_catalog(str(csv_path), str(tmp_path / "cache"))
+    assert len(catalog.df) == len(lines) - 1
+    assert catalog.df["Part ID"].dtype == "Int64"
+    assert catalog.df["Part ID"].isna().sum() == 1
+    assert not catalog.parts_for_number("PC2400BKD-EACH").empty
@@ -0,0 +1,52 @@
+import os
+import shutil
+import pytest
+import catalog as catalog_module
+from catalog import Catalog, load_catalog
+from catalog_watcher import CatalogWatcher
+
+DATA_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data.csv")
+
+
+@pytest.fixture
+def export(tmp_path):
+    csv_path = tmp_path / "export.csv"
+    shutil.copy(DATA_CSV, csv_path)
+    return csv_path
+
+
+def rewrite(csv_path, edit):
+    lines = csv_path.read_text(encoding="utf-8").splitlines()
+    csv_path.write_text("".join(line + "\n" for line in edit(lines)), encoding="utf-8")
+
+
+def watch(csv_path, tmp_path):
+    catalog = load_catalog(str(csv_path), str(tmp_path / "cache"))
+    return catalog, CatalogWatcher(catalog, str(csv_path), interval=0.01, cache_dir=str(tmp_path / "cache"))
+
+
+def test_row_changes_apply_incrementally(export, tmp_path):
+    catalog, watcher = watch(export, tmp_path)
+    rewrite(export, lambda lines: lines[:-2])
+    assert watcher.check()
+    [(_, diff)] = watcher.apply_pending()
+    assert not diff.full and len(diff.removed) == 2
+    assert sorted(catalog.by_part_number.items()) == sorted(Catalog(catalog.df).by_part_number.items())
+
+
+def test_full_reload_is_built_off_the_tk_thread(export, tmp_path, monkeypatch):
+    catalog, watcher = watch(export, tmp_path)
+    # A repeated Store Part ID means rows can't be matched up
+    rewrite(export, lambda lines: lines + lines[-1:])
+    assert watcher.check().full
+
+    def reindex(*args):
+        raise AssertionError("reindexed on the Tk thread")
+
+    monkeypatch.setattr(catalog_module.Catalog, "__init__", reindex)
+    monkeypatch.setattr(catalog_module, "keyed", reindex)
+    [(_, diff)] = watcher.apply_pending()
+    monkeypatch.undo()
+    assert diff.full
+    assert len(catalog.df) == len(open(DATA_CSV, encoding="utf-8").read().splitlines())
+    assert not catalog.parts_for_number("BCM9465").empty
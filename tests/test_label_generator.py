@@ -0,0 +1,74 @@
+import os
+from collections import OrderedDict
+import pytest
+import label_generator
+import zpl_cache
+from label_generator import (
+    clear_symbol_cache, code128_symbol, get_layout, load_symbol_cache, qr_symbol, render_1x2_product_label,
+    render_1x3_product_label, save_symbol_cache, symbol_cache_stats,
+)
+
+
+@pytest.mark.parametrize("label_type, render", [("1x2", render_1x2_product_label), ("1x3", render_1x3_product_label)])
+@pytest.mark.parametrize("length", [1, 11, 12, 17, 18, 40, 80])
+def test_long_barcodes_still_render(label_type, render, length):
+    # Past the slot's one-dot-per-module limit the symbol is resampled instead of failing
+    clear_symbol_cache()
+    label = render("BCM9465", "A" * length, "RED BARRICADE TAG", "CE20", "A" * length, "3M")
+    assert label.size == get_layout(label_type, "3M")["label_size"]
+
+
+@pytest.mark.parametrize("length", [1, 100, 1000])
+def test_symbols_fill_their_slot(length):
+    clear_symbol_cache()
+    assert qr_symbol("Q" * length, 101).size == (101, 101)
+    assert code128_symbol("A" * length, 182, 60).size == (182, 60)
+
+
+def test_oversized_symbols_stay_black_and_white():
+    clear_symbol_cache()
+    symbol = code128_symbol("A" * 100, 182, 60)  # Far more modules than the slot has dots
+    assert {value for _, value in symbol.convert("L").getcolors()} <= {0, 255}
+
+
+def test_symbol_cache_round_trips(tmp_path):
+    path = str(tmp_path / "symbols.pkl")
+    clear_symbol_cache()
+    qr_symbol("BCM9465", 101)
+    save_symbol_cache(path)
+    clear_symbol_cache()
+    load_symbol_cache(path)
+    assert symbol_cache_stats()["size"] == 1
+
+
+def test_symbol_cache_from_another_renderer_is_discarded(tmp_path, monkeypatch):
+    path = str(tmp_path / "symbols.pkl")
+    clear_symbol_cache()
+    qr_symbol("BCM9465", 101)
+    save_symbol_cache(path)
+    clear_symbol_cache()
+    monkeypatch.setattr(zpl_cache, "LAYOUT_VERSION", "changed")
+    load_symbol_cache(path)
+    assert symbol_cache_stats()["size"] == 0
+    assert not os.path.exists(path)
+
+
+def test_layout_version_reads_every_layout_module(monkeypatch):
+    # A module without a source file would silently fall back to the executable's stamp
+    assert "print_jobs" in zpl_cache.LAYOUT_MODULES
+    baseline = zpl_cache.layout_version()
+    for name in zpl_cache.LAYOUT_MODULES:
+        monkeypatch.setattr(zpl_cache, "LAYOUT_MODULES", tuple(m for m in zpl_cache.LAYOUT_MODULES if m != name))
+        assert zpl_cache.layout_version() != baseline, name
+        monkeypatch.undo()
+
+
+def test_layout_cache_keeps_only_recent_titles(monkeypatch):
+    monkeypatch.setattr(label_generator, "layout_cache", OrderedDict())
+    for i in range(label_generator.LAYOUT_CACHE_SIZE + 10):
+        get_layout("1x2", f"Provider {i}")
+    get_layout("1x2", "Provider 10")  # Most recently used again
+    get_layout("1x2", "Provider new")
+    assert len(label_generator.layout_cache) == label_generator.LAYOUT_CACHE_SIZE
+    assert ("1x2", "Provider 10", label_generator.DPI, label_generator.LABEL_MODE) in label_generator.layout_cache
+    assert ("1x2", "Provider 11", label_generator.DPI, label_generator.LABEL_MODE) not in label_generator.layout_cache
@@ -0,0 +1,40 @@
+import print_jobs
+from print_scheduler import PrintScheduler
+
+
+def test_render_errors_fail_the_job_not_the_printer(monkeypatch):
+    sent = []
+
+    def build_batch(items, backend, printer_name, threshold=None):
+        if items == ["bad"]:
+            raise ValueError("cannot render")
+        return "".join(items)
+
+    monkeypatch.setattr(print_jobs, "build_batch", build_batch)
+    monkeypatch.setattr(print_jobs, "send_batch", lambda zpl, printer, backend: sent.append((printer, zpl)) or True)
+
+    scheduler = PrintScheduler(["a", "b"])
+    scheduler.submit(["bad"], key="bin")
+    scheduler.submit(["ok"], key="bin")
+    assert scheduler.join(timeout=5)
+    scheduler.shutdown(wait=True)
+
+    assert scheduler.failed_jobs == 1
+    assert [zpl for _, zpl in sent] == ["ok"]
+    assert all(counts["up"] and not counts["failed"] for counts in scheduler.stats().values())
+
+
+def test_failed_sends_move_to_the_rest_of_the_group(monkeypatch):
+    sent = []
+    monkeypatch.setattr(print_jobs, "build_batch", lambda items, *args: "".join(items))
+    monkeypatch.setattr(print_jobs, "send_batch",
+                        lambda zpl, printer, backend: printer == "b" and (sent.append(zpl) or True))
+
+    scheduler = PrintScheduler(["a", "b"])
+    for label in ("1", "2", "3"):
+        scheduler.submit([label], key="bin")
+    assert scheduler.join(timeout=5)
+    scheduler.shutdown(wait=True)
+
+    assert sent == ["1", "2", "3"]
+    assert scheduler.failed_jobs == 0
@@ -0,0 +1,40 @@
+import print_jobs
+import stored_formats
+from print_worker import PrintWorker
+
+ITEMS = [("2x4", {"bin_location": "CE20", "title": "Warehouse"}, 1)]
+
+
+def run_jobs(monkeypatch, results):
+    """Submit one stored job per send result; returns the ZPL of each send, in order."""
+    sent = []
+    pending = iter(results)
+
+    def send_zpl_to_printer(zpl_content, printer_name):
+        sent.append(zpl_content)
+        return next(pending)
+
+    monkeypatch.setattr(print_jobs, "send_zpl_to_printer", send_zpl_to_printer)
+    worker = PrintWorker()
+    job_ids = [worker.submit(ITEMS, "Zebra_ZD421", "stored") for _ in results]
+    finished = set()
+    while len(finished) < len(job_ids):
+        job_id, state, _ = worker.events.get(timeout=5)
+        if state in ("done", "failed"):
+            finished.add(job_id)
+    worker.shutdown()
+    return sent
+
+
+def test_first_stored_job_sent_carries_the_format(monkeypatch):
+    for _ in range(20):
+        stored_formats.forget_printer("Zebra_ZD421")
+        sent = run_jobs(monkeypatch, [True, True, True])
+        assert ["^DF" in zpl for zpl in sent] == [True, False, False]
+
+
+def test_format_is_resent_after_the_job_carrying_it_fails(monkeypatch):
+    stored_formats.forget_printer("Zebra_ZD421")
+    sent = run_jobs(monkeypatch, [False, True, True])
+    assert ["^DF" in zpl for zpl in sent] == [True, True, False]
+    stored_formats.forget_printer("Zebra_ZD421")
@@ -0,0 +1,97 @@
+import os
+import queue
+import socket
+import threading
+import pytest
+import printer_manager
+
+
+@pytest.fixture
+def fake_lpr(tmp_path, monkeypatch):
+    """Put a stand-in lpr on PATH and list its queue as discovered; returns a setter for lpr's exit status."""
+    script = tmp_path / "lpr"
+
+    def exit_with(status):
+        script.write_text(f"#!/bin/sh\ncat > /dev/null\necho 'lpr: error' >&2\nexit {status}\n")
+        script.chmod(0o755)
+
+    exit_with(0)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ.get('PATH', '')}")
+    monkeypatch.setattr(printer_manager, "get_queues", lambda max_age=None: ["Zebra_ZD421"])
+    monkeypatch.setattr(printer_manager, "printer_handles", {})
+    return exit_with
+
+
+@pytest.mark.skipif(os.name == "nt", reason="CUPS only")
+def test_send_reports_lpr_failures(fake_lpr):
+    assert printer_manager.send_zpl("^XA^XZ", "Zebra_ZD421")
+    fake_lpr(1)
+    assert not printer_manager.send_zpl("^XA^XZ", "Zebra_ZD421")
+
+
+@pytest.fixture
+def closing_listener():
+    """A raw port that reads one job per connection and then closes it, like a printer dropping idle sockets."""
+    server = socket.create_server(("127.0.0.1", 0))
+    jobs = queue.Queue()
+
+    def serve():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            with conn:
+                job = b""
+                while not job.endswith(b"^XZ"):
+                    chunk = conn.recv(4096)
+                    if not chunk:
+                        break
+                    job += chunk
+            jobs.put(job)  # Only once the connection is closed
+
+    threading.Thread(target=serve, daemon=True).start()
+    yield server.getsockname()[1], jobs
+    server.close()
+
+
+def test_network_send_reconnects_after_the_printer_closes(closing_listener, monkeypatch):
+    port, jobs = closing_listener
+    monkeypatch.setattr(printer_manager, "network_printers", {})
+    printer_manager.add_network_printer("dock1", "127.0.0.1", port)
+    received = []
+    for i in range(3):
+        assert printer_manager.send_zpl(f"^XA^FDjob{i}^FS^XZ", "dock1")
+        received.append(jobs.get(timeout=5))
+    printer_manager.close_all()
+    assert received == [f"^XA^FDjob{i}^FS^XZ".encode("ascii") for i in range(3)]
+
+
+class StallingSocket:
+    """Accepts part of a job, then times out."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def send(self, data):
+        self.calls += 1
+        if self.calls > 1:
+            raise socket.timeout("timed out")
+        return len(data) // 2
+
+    def close(self):
+        pass
+
+
+def test_partly_sent_job_is_not_resent(monkeypatch):
+    printer = printer_manager.NetworkPrinter("127.0.0.1")
+    connects = []
+
+    def connect():
+        connects.append(1)
+        printer.sock = StallingSocket()
+
+    monkeypatch.setattr(printer, "connect", connect)
+    with pytest.raises(OSError):
+        printer.output(b"^XA^FDlabel^FS^XZ")
+    assert len(connects) == 1
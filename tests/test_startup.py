@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+from benchmark import GUI_SCRIPT, IMPORT_BUDGET_MS, bench_startup, startup_imports
+
+# Loaded in the background after the window appears, never by the startup imports
+DEFERRED_MODULES = ("pandas", "numpy", "PIL", "qrcode", "barcode", "zebrafy", "requests",
+                    "label_generator", "print_jobs", "catalog")
+
+
+def test_startup_imports_leave_the_heavy_stack_deferred():
+    code = "".join(statement + "\n" for statement in startup_imports(GUI_SCRIPT))
+    code += f"import sys\nprint(sorted(name for name in {DEFERRED_MODULES!r} if name in sys.modules))\n"
+    output = subprocess.check_output([sys.executable, "-c", code], text=True, cwd=os.path.dirname(GUI_SCRIPT))
+    assert output.strip().splitlines()[-1] == "[]"
+
+
+def test_startup_imports_fit_the_budget():
+    result = bench_startup(repeat=15)
+    assert result["median_ms"] <= IMPORT_BUDGET_MS, result
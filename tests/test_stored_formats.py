@@ -0,0 +1,30 @@
+import pytest
+import stored_formats
+from native_labels import qr_modules
+
+
+@pytest.fixture(autouse=True)
+def fresh_printer():
+    yield
+    stored_formats.forget_printer("Zebra_ZD421")
+
+
+def test_short_data_uses_the_stored_format():
+    zpl_content = stored_formats.stored_2x4_shelf_label("Zebra_ZD421", "CE20*CE10", "Warehouse")
+    assert "^XFR:LABEL2X4.ZPL" in zpl_content
+
+
+def test_bins_beyond_the_format_qr_fall_back_to_native():
+    # A data.csv-sized bin list that needs a version 7 QR
+    bin_location = "CE20*CE10*CF20*CF10*CG20*CG10*CH20*CH10*CJ20*CJ10*CK20"
+    assert qr_modules(bin_location) > stored_formats.FORMAT_QR_MODULES
+    zpl_content = stored_formats.stored_2x4_shelf_label("Zebra_ZD421", bin_location, "Warehouse")
+    assert "^XF" not in zpl_content and "^DF" not in zpl_content
+    assert "Zebra_ZD421" not in stored_formats.loaded_formats
+
+
+@pytest.mark.parametrize("qr_data, barcode_data", [("BCM9465" * 8, "2257898"), ("BCM9465", "2257898" * 4)])
+def test_oversized_product_symbols_fall_back_to_native(qr_data, barcode_data):
+    zpl_content = stored_formats.stored_1x3_product_label("Zebra_ZD421", qr_data, barcode_data, "RED BARRICADE TAG")
+    assert "^XF" not in zpl_content
+    assert "^BQN" in zpl_content and "^BCN" in zpl_content
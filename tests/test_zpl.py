@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+from label_generator import render_1x2_product_label, render_1x3_product_label, render_2x4_shelf_label
+from zpl import MAX_RUN, compress_rows, encode_run, image_to_bitmap, image_to_zpl
+
+PRODUCT_FIELDS = {
+    "qr_data": "BCM9465",
+    "barcode_data": "2257898",
+    "description": "RED BARRICADE TAG",
+    "bin_location": "CE20*CE10",
+    "product_code": "2257898",
+    "title": "MSC INDUSTRIAL SUPPLY",
+}
+
+LABEL_IDS = ["1x2", "1x3-rgb", "2x4-1bit", "odd-width"]
+
+
+@pytest.fixture
+def zebrafy():
+    return pytest.importorskip("zebrafy")
+
+
+def sample_labels():
+    yield render_1x2_product_label(**PRODUCT_FIELDS)
+    yield render_1x3_product_label(**PRODUCT_FIELDS, mode="RGB")
+    yield render_2x4_shelf_label("CE20", "Mobile Tool Trailer Warehouse", mode="1")
+
+    # Width not a multiple of 8, so the last byte of each row is padded
+    odd = Image.new("L", (101, 37), "white")
+    ImageDraw.Draw(odd).ellipse((3, 3, 97, 33), fill=96, outline="black")
+    yield odd
+
+
+def sample_bitmaps():
+    long_run = np.full((2, 300), 0x55, dtype=np.uint8)  # 599 "5"s in a row, then an "A"
+    long_run[:, -1] = 0x5A
+    yield long_run
+    yield np.zeros((3, 40), dtype=np.uint8)
+    yield np.full((3, 40), 0xFF, dtype=np.uint8)
+
+    mixed = np.random.default_rng(0).integers(0, 256, (12, 31), dtype=np.uint8)
+    mixed[3] = 0
+    mixed[4:7] = 0xFF  # Repeated rows
+    mixed[8, 10:] = 0  # Trailing zeros
+    mixed[9, 5:] = 0xFF  # Trailing Fs
+    yield mixed
+
+    for image in sample_labels():
+        yield image_to_bitmap(image)
+
+
+def decode_acs(data, bytes_per_row):
+    """Expand ZPL ASCII compressed graphic data, following the ^GF spec rather than compress_rows."""
+    row_length = bytes_per_row * 2
+    rows, row, count = [], "", 0
+    for char in data:
+        if "G" <= char <= "Y":
+            count += ord(char) - ord("F")
+        elif "g" <= char <= "z":
+            count += (ord(char) - ord("f")) * 20
+        elif char in ",!":
+            rows.append(row.ljust(row_length, "0" if char == "," else "F"))
+            row = ""
+        elif char == ":":
+            rows.append(rows[-1])
+        else:
+            row += char * (count or 1)
+            count = 0
+            if len(row) == row_length:
+                rows.append(row)
+                row = ""
+    assert not row and not count
+    return bytes.fromhex("".join(rows))
+
+
+@pytest.mark.parametrize("bitmap", list(sample_bitmaps()), ids=["long-run", "zeros", "ones", "mixed"] + LABEL_IDS)
+def test_acs_compression_round_trips(bitmap):
+    assert decode_acs(compress_rows(bitmap), bitmap.shape[1]) == bitmap.tobytes()
+
+
+@pytest.mark.parametrize("count", [1, 2, 19, 20, 21, 399, 400, MAX_RUN, MAX_RUN + 1, 1000])
+def test_encoded_runs_expand_to_their_length(count):
+    # A row twice as long as the run, with the rest filled by ","
+    assert decode_acs(encode_run("A", count) + ",", count) == bytes.fromhex("A" * count + "0" * count)
+
+
+@pytest.mark.parametrize("image", list(sample_labels()), ids=LABEL_IDS)
+def test_uncompressed_output_matches_zebrafy(image, zebrafy):
+    assert image_to_zpl(image, compress=False) == zebrafy.ZebrafyImage(image, invert=True).to_zpl()
+
+
+@pytest.mark.parametrize("encoding", ["z64", "b64"])
+@pytest.mark.parametrize("image", list(sample_labels()), ids=LABEL_IDS)
+def test_zb64_output_decodes_with_zebrafy(image, encoding, zebrafy):
+    # Zebrafy checks the CRC the way the printer does and raises on a mismatch
+    expected = zebrafy.ZebrafyZPL(image_to_zpl(image, compress=False)).to_images()[0]
+    decoded = zebrafy.ZebrafyZPL(image_to_zpl(image, encoding=encoding)).to_images()[0]
+    assert decoded.tobytes() == expected.tobytes()
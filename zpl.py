@@ -0,0 +1,214 @@
+import base64
+import binascii
+import hashlib
+import os
+import re
+import zlib
+from collections import Counter
+import numpy as np
+
+
+# Longest run a single ZPL repeat count can express: "z" (400) + "Y" (19)
+MAX_RUN = 419
+
+RUN_PATTERN = re.compile(r"([0-9A-F])\1{2,}")
+
+# Encodings for compressed graphic data: ZPL ASCII run-length (ACS), and zlib-compressed
+# or plain base64 with a CRC (Z64, B64). Firmware without ZB64 support only takes ACS.
+GRAPHIC_ENCODINGS = ("acs", "z64", "b64")
+
+# "auto" sends each graphic field in whichever encoding is shortest; LABEL_GRAPHIC_ENCODING=acs
+# forces run-length compression for older printers
+GRAPHIC_ENCODING = os.environ.get("LABEL_GRAPHIC_ENCODING", "auto")
+
+# Graphic fields at least this long that repeat within a job are downloaded once with ~DG
+SHARED_GRAPHIC_MIN_CHARS = 256
+
+# Each byte value with its bit order reversed, for the reflected ZB64 CRC
+REVERSED_BITS = bytes(int(f"{value:08b}"[::-1], 2) for value in range(256))
+
+GRAPHIC_FIELD_PATTERN = re.compile(r"\^GFA,(\d+),(\d+),(\d+),([^^~]*)\^FS")
+
+
+def binarize(label_image, dither=True, threshold=128):
+    """Reduce a label to printer dots: Floyd-Steinberg dithering, or a hard threshold on gray level."""
+    if label_image.mode == "1":
+        return label_image
+    if label_image.mode != "L":
+        label_image = label_image.convert("L")
+    if dither:
+        return label_image.convert("1")
+    return label_image.point(lambda x: 255 if x > threshold else 0, mode="1")
+
+
+def image_to_bitmap(label_image, dither=True, threshold=128):
+    """Pack a PIL image into rows of bytes where a 1 bit is a printed (black) dot."""
+    label_image = binarize(label_image, dither=dither, threshold=threshold)
+
+    # Mode "1" pixels come out of NumPy as booleans where True is white
+    black = ~np.asarray(label_image, dtype=bool)
+    return np.packbits(black, axis=1)
+
+
+def encode_run(char, count):
+    """Encode a run of one hex character with ZPL repeat counts (G-Y and g-z)."""
+    encoded = ""
+    while count > 0:
+        run = min(count, MAX_RUN)
+        count -= run
+        tens, units = divmod(run, 20)
+        if tens:
+            encoded += chr(ord("f") + tens)
+        if units:
+            encoded += chr(ord("F") + units)
+        encoded += char
+    return encoded
+
+
+def compress_rows(bitmap):
+    """Compress a packed bitmap with ZPL ASCII run-length compression."""
+    hex_data = bitmap.tobytes().hex().upper()
+    row_length = bitmap.shape[1] * 2
+
+    # Compare every row with the one above it in a single vectorized pass
+    repeated = np.zeros(bitmap.shape[0], dtype=bool)
+    repeated[1:] = np.all(bitmap[1:] == bitmap[:-1], axis=1)
+
+    rows = []
+    for index, start in enumerate(range(0, len(hex_data), row_length)):
+        if repeated[index]:
+            rows.append(":")
+            continue
+
+        row = hex_data[start:start + row_length]
+        fill = ""
+        if row.endswith("0"):
+            row, fill = row.rstrip("0"), ","
+        elif row.endswith("F"):
+            row, fill = row.rstrip("F"), "!"
+
+        rows.append(RUN_PATTERN.sub(lambda m: encode_run(m.group(1), len(m.group(0))), row) + fill)
+    return "".join(rows)
+
+
+def zb64_crc(encoded):
+    """CRC of ZB64 base64 text as the printer checks it: reflected CRC-16-CCITT (X.25), high byte last.
+
+    binascii.crc_hqx is the unreflected variant; running it over bit-reversed bytes and
+    reversing each result byte gives the reflected CRC with the bytes already swapped.
+    """
+    crc = binascii.crc_hqx(encoded.translate(REVERSED_BITS), 0xFFFF) ^ 0xFFFF
+    return REVERSED_BITS[crc >> 8] << 8 | REVERSED_BITS[crc & 0xFF]
+
+
+def zb64(data, header):
+    """Wrap bytes as ZB64 field data: the :B64: or :Z64: header, base64 text and its CRC."""
+    encoded = base64.b64encode(data)
+    return f"{header}{encoded.decode('ascii')}:{zb64_crc(encoded):04X}"
+
+
+def encode_graphic_data(bitmap, encoding=None):
+    """Encode a packed bitmap as graphic field data; returns (encoding, data).
+
+    With "auto" every compressed encoding is tried and the shortest is kept.
+    """
+    if encoding is None:
+        encoding = GRAPHIC_ENCODING
+    if encoding == "auto":
+        return min((encode_graphic_data(bitmap, name) for name in GRAPHIC_ENCODINGS), key=lambda pair: len(pair[1]))
+    if encoding == "acs":
+        return encoding, compress_rows(bitmap)
+    if encoding == "z64":
+        return encoding, zb64(zlib.compress(bitmap.tobytes(), 9), ":Z64:")
+    if encoding == "b64":
+        return encoding, zb64(bitmap.tobytes(), ":B64:")
+    raise ValueError(f"Unknown graphic encoding: {encoding}")
+
+
+def bitmap_to_graphic_field(bitmap, compress=True, binary=False, encoding=None):
+    """Encode a packed bitmap as a ^GFA (ASCII) or ^GFB (binary) graphic field."""
+    bytes_per_row = bitmap.shape[1]
+    total_bytes = bitmap.size
+
+    if binary:
+        header = f"^GFB,{total_bytes},{total_bytes},{bytes_per_row},".encode("ascii")
+        return header + bitmap.tobytes() + b"^FS"
+
+    if compress:
+        _, data = encode_graphic_data(bitmap, encoding)
+        byte_count = total_bytes
+    else:
+        # Zebrafy reports the hex character count here; keep it for identical output
+        data = bitmap.tobytes().hex()
+        byte_count = len(data)
+    return f"^GFA,{byte_count},{total_bytes},{bytes_per_row},{data}^FS"
+
+
+def image_to_graphic_field(label_image, compress=True, binary=False, dither=True, threshold=128, encoding=None):
+    """Encode a PIL image as a ^GFA (ASCII) or ^GFB (binary) graphic field."""
+    bitmap = image_to_bitmap(label_image, dither=dither, threshold=threshold)
+    return bitmap_to_graphic_field(bitmap, compress=compress, binary=binary, encoding=encoding)
+
+
+def row_bands(bitmap, splits=()):
+    """(first row, end row) of the bands between split rows, skipping bands with no printed dots."""
+    edges = sorted({0, bitmap.shape[0], *(row for row in splits if 0 < row < bitmap.shape[0])})
+    return [(start, end) for start, end in zip(edges, edges[1:]) if bitmap[start:end].any()]
+
+
+def image_to_zpl(label_image, compress=True, binary=False, pos_x=0, pos_y=0, dither=True, threshold=128,
+                 encoding=None, splits=None):
+    """Convert a PIL label image to a complete ZPL label.
+
+    Compressed ASCII data uses the encoding given, or LABEL_GRAPHIC_ENCODING. With splits
+    (row offsets) the image goes out as one graphic field per band and blank bands are
+    left out, so a band shared by many labels, like the title, encodes identically in each.
+    Uncompressed ASCII output without splits is byte-for-byte what
+    ZebrafyImage(image, invert=True) produces. ^GFB output is returned as bytes since
+    it carries raw bitmap data.
+    """
+    bitmap = image_to_bitmap(label_image, dither=dither, threshold=threshold)
+    bands = [(0, bitmap.shape[0])] if splits is None else row_bands(bitmap, splits)
+    fields = []
+    for start, end in bands:
+        graphic_field = bitmap_to_graphic_field(bitmap[start:end], compress=compress, binary=binary, encoding=encoding)
+        position = f"^FO{pos_x},{pos_y + start}"
+        fields.append(position.encode("ascii") + graphic_field if binary else position + graphic_field)
+    if binary:
+        return b"^XA\n" + b"\n".join(fields) + b"\n^XZ\n"
+    return "^XA\n" + "\n".join(fields) + "\n^XZ\n"
+
+
+def graphic_name(graphic_field):
+    """Printer object name for a shared graphic, derived from its content."""
+    return f"R:G{hashlib.sha1(graphic_field.encode('ascii')).hexdigest()[:7].upper()}.GRF"
+
+
+def share_graphics(labels, min_chars=SHARED_GRAPHIC_MIN_CHARS):
+    """Join labels into one job, downloading graphics that repeat across labels once.
+
+    Each ^GFA field found in more than one label is sent up front with ~DG and
+    recalled with ^XG; the graphics are deleted from printer memory at the end of
+    the job. Labels without repeated graphics are joined unchanged.
+    """
+    counts = Counter()
+    for zpl_content in labels:
+        counts.update({match.group(0) for match in GRAPHIC_FIELD_PATTERN.finditer(zpl_content)})
+    shared = {field for field, count in counts.items() if count > 1 and len(field) >= min_chars}
+    if not shared:
+        return "".join(labels)
+
+    downloads, recalls = [], {}
+    for graphic_field in sorted(shared):
+        name = graphic_name(graphic_field)
+        _, total_bytes, bytes_per_row, data = GRAPHIC_FIELD_PATTERN.fullmatch(graphic_field).groups()
+        downloads.append(f"~DG{name},{total_bytes},{bytes_per_row},{data}\n")
+        recalls[graphic_field] = name
+
+    def recall(match):
+        name = recalls.get(match.group(0))
+        return f"^XG{name},1,1^FS" if name else match.group(0)
+
+    body = "".join(GRAPHIC_FIELD_PATTERN.sub(recall, zpl_content) for zpl_content in labels)
+    cleanup = "^XA" + "".join(f"^ID{name}^FS" for name in recalls.values()) + "^XZ\n"
+    return "".join(downloads) + body + cleanup
@@ -0,0 +1,173 @@
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+import label_generator
+import zpl
+
+
+# Rendered label ZPL keyed by a hash of everything that decides its bytes
+ZPL_CACHE_SIZE = 512  # in-memory entries
+ZPL_CACHE_MAX_BYTES = 64 * 1024 * 1024  # on-disk store
+ZPL_CACHE_DIR = os.path.join(
+    os.environ.get("LABEL_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "printer")),
+    "zpl",
+)
+
+# Modules whose code shapes rendered labels; editing any of them starts a fresh keyspace.
+# By name, because print_jobs (which picks the graphic band splits) imports this module.
+LAYOUT_MODULES = ("label_generator", "native_labels", "zpl", "fonts", "print_jobs")
+
+memory_cache = OrderedDict()
+cache_stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+cache_lock = threading.Lock()
+disk_usage = {"bytes": None}
+
+
+def layout_version():
+    """Fingerprint of the rendering code, so cached ZPL from older layouts is never reused."""
+    digest = hashlib.sha1()
+    for name in LAYOUT_MODULES:
+        try:
+            with open(importlib.util.find_spec(name).origin, "rb") as f:
+                digest.update(f.read())
+        except (AttributeError, TypeError, OSError):
+            # Frozen builds have no sources; a rebuilt executable gets a new version
+            stat = os.stat(sys.executable)
+            digest.update(f"{sys.executable}:{stat.st_mtime}:{stat.st_size}".encode("utf-8"))
+            break
+    return digest.hexdigest()[:12]
+
+
+LAYOUT_VERSION = layout_version()
+
+
+def cache_key(label_type, fields, backend, threshold=None):
+    """Content address for a rendered label."""
+    payload = json.dumps({
+        "version": LAYOUT_VERSION,
+        "label": label_type,
+        "fields": fields,
+        "backend": backend,
+        "threshold": threshold,
+        "mode": label_generator.LABEL_MODE,
+        "encoding": zpl.GRAPHIC_ENCODING,
+        "fonts": os.environ.get("LABEL_FONT_PATH", ""),
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def entry_path(key):
+    """On-disk location of a cache entry, fanned out over 256 subdirectories."""
+    return os.path.join(ZPL_CACHE_DIR, key[:2], key + ".zpl")
+
+
+def remember(key, zpl_content):
+    """Put an entry at the front of the in-memory LRU."""
+    with cache_lock:
+        memory_cache[key] = zpl_content
+        memory_cache.move_to_end(key)
+        while len(memory_cache) > ZPL_CACHE_SIZE:
+            memory_cache.popitem(last=False)
+
+
+def get_cached_zpl(key):
+    """Return cached ZPL for a key from memory or disk, or None."""
+    with cache_lock:
+        zpl_content = memory_cache.get(key)
+        if zpl_content is not None:
+            memory_cache.move_to_end(key)
+            cache_stats["hits"] += 1
+            return zpl_content
+
+    path = entry_path(key)
+    try:
+        with open(path, encoding="utf-8") as f:
+            zpl_content = f.read()
+        os.utime(path)  # Eviction drops the least recently used files first
+    except OSError:
+        with cache_lock:
+            cache_stats["misses"] += 1
+        return None
+
+    with cache_lock:
+        cache_stats["disk_hits"] += 1
+    remember(key, zpl_content)
+    return zpl_content
+
+
+def put_cached_zpl(key, zpl_content):
+    """Store rendered ZPL in memory and on disk, trimming the disk store to its size limit."""
+    remember(key, zpl_content)
+    path = entry_path(key)
+    data = zpl_content.encode("utf-8")
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Failed to write ZPL cache entry: {e}")
+        return
+
+    with cache_lock:
+        if disk_usage["bytes"] is None:
+            disk_usage["bytes"] = sum(size for _, size, _ in disk_entries())
+        else:
+            disk_usage["bytes"] += len(data)
+        over = disk_usage["bytes"] > ZPL_CACHE_MAX_BYTES
+    if over:
+        trim_disk_cache()
+
+
+def disk_entries():
+    """(path, size, last use) for every file in the disk store."""
+    entries = []
+    for root, _, files in os.walk(ZPL_CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+    return entries
+
+
+def trim_disk_cache(max_bytes=None):
+    """Delete least recently used entries until the store is under 90% of its limit."""
+    if max_bytes is None:
+        max_bytes = ZPL_CACHE_MAX_BYTES
+    entries = sorted(disk_entries(), key=lambda entry: entry[2])
+    total = sum(size for _, size, _ in entries)
+    target = max_bytes * 0.9
+    for path, size, _ in entries:
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+    with cache_lock:
+        disk_usage["bytes"] = total
+
+
+def zpl_cache_stats():
+    """Hit/miss counters plus the current in-memory entry count."""
+    with cache_lock:
+        return dict(cache_stats, size=len(memory_cache), version=LAYOUT_VERSION)
+
+
+def clear_zpl_cache(disk=False):
+    """Drop the in-memory entries, and optionally the disk store too."""
+    with cache_lock:
+        memory_cache.clear()
+        for name in cache_stats:
+            cache_stats[name] = 0
+    if disk:
+        trim_disk_cache(max_bytes=0)